@@ -5,6 +5,11 @@ import axios from 'axios'
 
 const router = Router()
 
+// The ML service is told to answer within this budget (falling back to its
+// rule-based prediction under load) so it replies before axios gives up
+const ML_TIMEOUT_MS = 5000
+const ML_DEADLINE_MS = ML_TIMEOUT_MS - 500
+
 interface ChatMessage {
   role: 'user' | 'assistant'
   content: string
@@ -54,7 +59,10 @@ router.post('/analyze', async (req: Request<{}, {}, AnalyzeRequest>, res: Respon
         const mlResponse = await axios.post(
           `${process.env.ML_MODEL_API_URL}/predict`,
           { symptoms },
-          { timeout: 5000 }
+          {
+            timeout: ML_TIMEOUT_MS,
+            headers: { 'X-Request-Deadline-Ms': String(ML_DEADLINE_MS) }
+          }
         )
         prediction = mlResponse.data
       } catch (mlError) {
@@ -0,0 +1,73 @@
+"""
+Admission Control
+Bounded model-inference capacity and per-request deadlines for load shedding
+
+A request that needs the model must take one of ``max_pending`` slots and
+finish inference before its deadline. When no slot is free or the deadline
+can no longer be met, the request is shed: the API answers it right away
+from the rule-based fallback instead of queueing work nobody will wait for.
+"""
+
+import time
+from typing import Optional
+
+# Header carrying how many milliseconds the caller will wait for a response
+DEADLINE_HEADER = "x-request-deadline-ms"
+
+
+class DeadlineExceeded(Exception):
+    """A queued row's deadline passed before it could be scored"""
+
+
+class LoadShed(Exception):
+    """A request was refused model inference ("queue_full" or "deadline")"""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+def request_deadline(header_value: Optional[str], received_at: float, default_ms: float, max_ms: float) -> float:
+    """
+    perf_counter() time by which a request must be answered
+
+    Uses the caller's header value when it is a positive number of
+    milliseconds (capped at max_ms), and default_ms otherwise.
+    """
+    budget_ms = default_ms
+    if header_value:
+        try:
+            requested = float(header_value)
+        except ValueError:
+            requested = 0
+        if requested > 0:
+            budget_ms = min(requested, max_ms)
+    return received_at + budget_ms / 1000
+
+
+class AdmissionController:
+    """
+    Counts requests waiting for or running model inference.
+
+    Only used from the event loop, so the counter needs no lock.
+    """
+
+    def __init__(self, max_pending: int):
+        self.max_pending = max_pending
+        self.pending = 0
+        self.peak = 0
+
+    def acquire(self, deadline: float):
+        """Take a slot, raising LoadShed if none is free or the deadline already passed"""
+        if self.pending >= self.max_pending:
+            raise LoadShed("queue_full")
+        if time.perf_counter() >= deadline:
+            raise LoadShed("deadline")
+        self.pending += 1
+        self.peak = max(self.peak, self.pending)
+
+    def release(self):
+        self.pending -= 1
+
+    def stats(self) -> dict:
+        return {"max_pending": self.max_pending, "pending": self.pending, "peak_pending": self.peak}
@@ -3,21 +3,63 @@ Disease Prediction API
 FastAPI server for the ML model that predicts diseases based on symptoms
 """
 
-from fastapi import FastAPI, HTTPException
+import time
+
+# Taken before the imports below so cold-start time can be reported
+_import_started = time.perf_counter()
+
+from fastapi import FastAPI, Header, HTTPException, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import List, Optional
-import joblib
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
+from typing import Annotated, List, Optional, Tuple
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import json
 import numpy as np
 import os
+import threading
 from pathlib import Path
 
+from admission import DEADLINE_HEADER, AdmissionController, DeadlineExceeded, LoadShed, request_deadline
+from batching import MicroBatcher
+from metrics import Counter, Histogram, Registry
+from serve import process_memory
+from sessions import MAX_SYMPTOM_LENGTH, SessionStore, SymptomSession
+from shadow import ShadowEvaluator
+from model_bundle import ModelBundle, load_bundle, validate_bundle
+from payloads import CachedPayload, PredictionPayloads, dumps
+from rule_engine import RuleEngine
+from symptom_vocabulary import SymptomVocabulary
+
+IMPORT_SECONDS = time.perf_counter() - _import_started
+
 app = FastAPI(
     title="Disease Prediction API",
     description="ML-powered disease prediction based on symptoms",
     version="1.0.0"
 )
 
+
+# Scope key holding the perf_counter() value at which a request arrived
+RECEIVED_AT = "ml.received_at"
+
+
+class RequestTimer:
+    """ASGI middleware stamping each request's arrival time, so handlers can time body parsing"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            scope[RECEIVED_AT] = time.perf_counter()
+        await self.app(scope, receive, send)
+
+
+app.add_middleware(RequestTimer)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -29,10 +71,130 @@ app.add_middleware(
 
 # Load the trained model and encoders
 MODEL_PATH = Path(__file__).parent / "models"
-model = None
-symptom_encoder = None
-disease_encoder = None
-symptom_list = None
+MODEL_FILE = MODEL_PATH / "disease_predictor.joblib"
+
+# The active model bundle. It is replaced as a whole on reload, never mutated,
+# so handlers take one reference and use it for the entire request.
+bundle: Optional[ModelBundle] = None
+# Set once a bundle has been loaded and warmed, by startup or by a reload;
+# until then requests get rule-based predictions
+model_ready = False
+
+# Poll models/ for a new artifact every ML_MODEL_WATCH_SECONDS (0 disables)
+MODEL_WATCH_SECONDS = float(os.getenv("ML_MODEL_WATCH_SECONDS", "0"))
+# When set, /admin endpoints require a matching X-Admin-Token header; when unset
+# they only answer clients on the loopback interface
+ADMIN_TOKEN = os.getenv("ML_ADMIN_TOKEN")
+LOOPBACK_HOSTS = {"127.0.0.1", "::1", "localhost"}
+# Memory-map the artifact's arrays (copy-on-write) so worker processes share their pages
+MODEL_MMAP = os.getenv("ML_MODEL_MMAP", "0") == "1"
+# Score tree-ensemble models with the array-based forest engine (small batches)
+COMPILED_FOREST = os.getenv("ML_COMPILED_FOREST", "1") == "1"
+
+# When 0, a pod without a loadable artifact reports ready and serves rule-based predictions
+REQUIRE_MODEL = os.getenv("ML_REQUIRE_MODEL", "1") == "1"
+
+# Multi-worker serving: the supervisor loads the model once and forks workers
+WORKERS = int(os.getenv("ML_WORKERS", "1"))
+# "auto" pins worker i to the i-th CPU; "0,2,4" pins to the listed CPUs
+CPU_AFFINITY = os.getenv("ML_CPU_AFFINITY")
+# Log per-worker memory from the supervisor at this interval (0 disables)
+WORKER_REPORT_SECONDS = float(os.getenv("ML_WORKER_REPORT_SECONDS", "0"))
+
+# Upper bound on the number of items accepted by /predict/batch
+MAX_BATCH_SIZE = 1024
+
+# Ranked candidates kept per model prediction; top_k may ask for up to this many
+MAX_TOP_K = 10
+
+# Model inference runs on a bounded thread pool so a slow model never blocks
+# the event loop (numpy/sklearn release the GIL in their hot loops)
+INFERENCE_WORKERS = int(os.getenv("ML_INFERENCE_WORKERS", str(min(4, os.cpu_count() or 1))))
+inference_executor: Optional[ThreadPoolExecutor] = None
+
+# Concurrent /predict requests are coalesced into micro-batches: a batch is
+# scored once ML_BATCH_MAX_SIZE rows are waiting or ML_BATCH_WINDOW_MS passed
+BATCHING_ENABLED = os.getenv("ML_BATCHING", "1") == "1"
+BATCH_WINDOW_MS = float(os.getenv("ML_BATCH_WINDOW_MS", "2"))
+BATCH_MAX_SIZE = int(os.getenv("ML_BATCH_MAX_SIZE", "32"))
+batcher: Optional[MicroBatcher] = None
+
+# Admission control: at most ML_MAX_PENDING requests wait for or run model
+# inference, and each must be answered within the caller's X-Request-Deadline-Ms
+# (or ML_DEADLINE_MS, just under the backend's 5 s timeout). Anything beyond
+# that is shed to the rule-based fallback with "degraded": true.
+MAX_PENDING = int(os.getenv("ML_MAX_PENDING", "256"))
+DEADLINE_MS = float(os.getenv("ML_DEADLINE_MS", "4500"))
+MAX_DEADLINE_MS = float(os.getenv("ML_MAX_DEADLINE_MS", "30000"))
+admission = AdmissionController(MAX_PENDING)
+
+# Shadow evaluation: a candidate artifact at ML_SHADOW_MODEL_PATH scores
+# ML_SHADOW_SAMPLE_RATE of model predictions on a low-priority thread, off the
+# request path, so it can be compared with the live model before promotion
+SHADOW_MODEL_PATH = os.getenv("ML_SHADOW_MODEL_PATH")
+SHADOW_SAMPLE_RATE = float(os.getenv("ML_SHADOW_SAMPLE_RATE", "0.1"))
+SHADOW_QUEUE_SIZE = int(os.getenv("ML_SHADOW_QUEUE_SIZE", "1000"))
+shadow: Optional[ShadowEvaluator] = None
+
+# Conversation sessions of the /ws/conversations WebSocket: at most
+# ML_WS_MAX_SESSIONS are kept, and any idle for ML_WS_SESSION_IDLE_SECONDS are dropped
+WS_MAX_SESSIONS = int(os.getenv("ML_WS_MAX_SESSIONS", "10000"))
+WS_SESSION_IDLE_SECONDS = float(os.getenv("ML_WS_SESSION_IDLE_SECONDS", "1800"))
+sessions = SessionStore(WS_MAX_SESSIONS, WS_SESSION_IDLE_SECONDS)
+
+# Model predictions are cached by symptom bitmask (ML_CACHE_SIZE=0 disables,
+# ML_CACHE_TTL_SECONDS=0 keeps entries until evicted or the model changes)
+CACHE_SIZE = int(os.getenv("ML_CACHE_SIZE", "4096"))
+CACHE_TTL_SECONDS = float(os.getenv("ML_CACHE_TTL_SECONDS", "0"))
+# Optional JSON/JSONL file of historical symptom lists used to pre-populate the cache
+CACHE_WARMUP_FILE = os.getenv("ML_CACHE_WARMUP_FILE")
+CACHE_WARMUP_SIZE = int(os.getenv("ML_CACHE_WARMUP_SIZE", "256"))
+
+# Prometheus metrics served at /metrics. Stages are timed per /predict request;
+# model calls (one per micro-batch or batch request) are timed separately.
+STAGE_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0
+)
+metrics_registry = Registry()
+PREDICT_STAGES = {
+    stage: metrics_registry.register(Histogram(
+        "ml_predict_stage_seconds", "Time spent in each stage of a /predict request",
+        STAGE_BUCKETS, {"stage": stage}
+    ))
+    for stage in ("parse", "encode", "cache", "inference", "lookup", "serialize")
+}
+MODEL_CALL_STEPS = {
+    step: metrics_registry.register(Histogram(
+        "ml_model_call_seconds", "Time per model call: predict_proba with top-k, then label decoding",
+        STAGE_BUCKETS, {"step": step}
+    ))
+    for step in ("predict", "decode")
+}
+PREDICTION_ENDPOINTS = ("predict", "predict_batch", "predict_ws")
+PREDICTIONS = {
+    (endpoint, path): metrics_registry.register(Counter(
+        "ml_predictions_total", "Predictions served, by endpoint and path (model, cache or fallback)",
+        {"endpoint": endpoint, "path": path}
+    ))
+    for endpoint in PREDICTION_ENDPOINTS
+    for path in ("model", "cache", "fallback", "degraded")
+}
+PREDICTION_ERRORS = {
+    endpoint: metrics_registry.register(Counter(
+        "ml_prediction_errors_total", "Exceptions caught while predicting (answered by the fallback)",
+        {"endpoint": endpoint}
+    ))
+    for endpoint in PREDICTION_ENDPOINTS
+}
+SHED_REQUESTS = {
+    (endpoint, reason): metrics_registry.register(Counter(
+        "ml_shed_requests_total", "Requests answered by the fallback (degraded) instead of waiting for the model",
+        {"endpoint": endpoint, "reason": reason}
+    ))
+    for endpoint in PREDICTION_ENDPOINTS
+    for reason in ("queue_full", "deadline")
+}
 
 # Disease information database
 DISEASE_INFO = {
@@ -138,6 +300,18 @@ DISEASE_INFO = {
     }
 }
 
+# Disease info used when a predicted disease has no DISEASE_INFO entry
+MODEL_DEFAULT_INFO = {
+    "description": "Please consult a healthcare professional.",
+    "precautions": ["Seek medical advice"],
+    "specialist": "General Physician"
+}
+FALLBACK_DEFAULT_INFO = {
+    "description": "Please consult a healthcare professional for proper diagnosis.",
+    "precautions": ["Rest well", "Stay hydrated", "Monitor symptoms", "Seek medical advice if symptoms persist"],
+    "specialist": "General Physician"
+}
+
 # Complete symptom list for the model
 ALL_SYMPTOMS = [
     "fever", "headache", "cough", "fatigue", "nausea", "vomiting", "diarrhea",
@@ -149,236 +323,1047 @@ ALL_SYMPTOMS = [
     "numbness", "tingling", "weakness", "confusion", "memory_loss"
 ]
 
+# Rule table for the fallback predictor: disease -> characteristic symptoms.
+# A disease is scored by the share of its symptoms present, so adding one
+# here (with its DISEASE_INFO entry) is all the fallback path needs.
+FALLBACK_RULES = {
+    "Common Cold": ["cough", "runny_nose", "sore_throat", "sneezing", "congestion"],
+    "Influenza (Flu)": ["fever", "cough", "fatigue", "muscle_pain", "headache", "chills"],
+    "Migraine": ["headache", "nausea", "blurred_vision", "dizziness"],
+    "Gastritis": ["abdominal_pain", "nausea", "vomiting", "loss_of_appetite"],
+    "Asthma": ["shortness_of_breath", "cough", "chest_pain", "wheezing"],
+    "Anxiety Disorder": ["anxiety", "palpitations", "sweating", "insomnia", "dizziness"],
+    "Diabetes Type 2": ["frequent_urination", "excessive_thirst", "fatigue", "blurred_vision", "weight_loss"],
+    "Eczema": ["skin_rash", "itching", "swelling"],
+    "Bronchitis": ["cough", "shortness_of_breath", "chest_pain", "fatigue", "fever"],
+}
+
+# Symptoms understood by the rule-based fallback
+FALLBACK_SYMPTOMS = ALL_SYMPTOMS + sorted(
+    {symptom for symptoms in FALLBACK_RULES.values() for symptom in symptoms} - set(ALL_SYMPTOMS)
+)
+
+# Symptoms recognized while no model is loaded
+default_vocabulary = SymptomVocabulary(ALL_SYMPTOMS)
+fallback_vocabulary = SymptomVocabulary(FALLBACK_SYMPTOMS)
+rule_engine = RuleEngine(FALLBACK_RULES, fallback_vocabulary)
+
 
 class SymptomInput(BaseModel):
     symptoms: List[str]
+    top_k: Optional[int] = Field(default=None, ge=1, le=MAX_TOP_K)
+
+
+# A symptom name in a WebSocket message; sessions remember unknown ones
+SymptomName = Annotated[str, Field(max_length=MAX_SYMPTOM_LENGTH)]
+
+
+class SymptomDelta(BaseModel):
+    """A WebSocket message changing a conversation's symptoms"""
+    add: List[SymptomName] = []
+    remove: List[SymptomName] = []
+    # Clear the session before applying add
+    reset: bool = False
+    # Kept for the rest of the conversation once set
+    top_k: Optional[int] = Field(default=None, ge=1, le=MAX_TOP_K)
+
+
+class DiagnosisCandidate(BaseModel):
+    disease: str
+    confidence: float
+    specialist: str
 
 
 class PredictionResponse(BaseModel):
+    model_config = ConfigDict(protected_namespaces=())
+
     disease: str
     confidence: float
     description: str
     precautions: List[str]
     specialist: str
+    unknown_symptoms: List[str] = []
+    differential: Optional[List[DiagnosisCandidate]] = None
+    model_version: Optional[str] = None
+    # Set when the request was shed under load and answered by the fallback
+    degraded: Optional[bool] = None
+
+
+class BatchSymptomInput(BaseModel):
+    items: List[SymptomInput]
+    top_k: Optional[int] = Field(default=None, ge=1, le=MAX_TOP_K)
+
+
+class BatchPredictionResponse(BaseModel):
+    predictions: List[PredictionResponse]
+    count: int
 
 
 class HealthCheckResponse(BaseModel):
+    model_config = ConfigDict(protected_namespaces=())
+
     status: str
     model_loaded: bool
     version: str
+    model_version: Optional[str] = None
+
+
+class PredictionCache:
+    """
+    Bounded LRU cache of ranked model predictions with an optional TTL
+
+    Handlers use it on the event loop while cache warm-up fills it from a
+    worker thread, so every access holds the lock.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float = 0):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: int) -> Optional[List[Tuple[str, float]]]:
+        """Return the cached ranking for key, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, payload = entry
+            if expires_at and expires_at < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return payload
+
+    def put(self, key: int, payload: List[Tuple[str, float]]):
+        """Store a ranking, evicting the least recently used entry when full"""
+        if self.max_size <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds > 0 else 0
+        with self._lock:
+            self._entries[key] = (expires_at, payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every entry (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Return size and hit/miss/eviction counters"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+
+prediction_cache = PredictionCache(CACHE_SIZE, CACHE_TTL_SECONDS)
+
+# /predict bodies are spliced from per-disease JSON fragments encoded once here
+model_payloads = PredictionPayloads(DISEASE_INFO, MODEL_DEFAULT_INFO)
+fallback_payloads = PredictionPayloads(DISEASE_INFO, FALLBACK_DEFAULT_INFO)
+
+# Catalog bodies: /diseases only changes with a deploy, /symptoms with the served model
+diseases_payload = CachedPayload({"diseases": DISEASE_INFO, "count": len(DISEASE_INFO)}, "public, max-age=3600")
+_symptoms_payload: Tuple[Optional[SymptomVocabulary], Optional[CachedPayload]] = (None, None)
 
 
 def load_model():
     """Load the trained model and encoders"""
-    global model, symptom_encoder, disease_encoder, symptom_list
-    
+    started = time.perf_counter()
     try:
-        model_file = MODEL_PATH / "disease_predictor.joblib"
-        if model_file.exists():
-            saved_data = joblib.load(model_file)
-            model = saved_data.get('model')
-            symptom_encoder = saved_data.get('symptom_encoder')
-            disease_encoder = saved_data.get('disease_encoder')
-            symptom_list = saved_data.get('symptom_list', ALL_SYMPTOMS)
-            print("✅ Model loaded successfully")
+        if MODEL_FILE.exists():
+            new_bundle = load_bundle(MODEL_FILE, ALL_SYMPTOMS, "c" if MODEL_MMAP else None, COMPILED_FOREST)
+            validate_bundle(new_bundle)
+            activate_bundle(new_bundle)
+            startup_loader.timings["load_seconds"] = round(time.perf_counter() - started, 4)
+            print(f"✅ Model loaded successfully (version {new_bundle.version})")
             return True
         else:
             print("⚠️ Model file not found. Using fallback prediction.")
             return False
     except Exception as e:
+        startup_loader.error = str(e)
         print(f"❌ Error loading model: {e}")
         return False
 
 
-def preprocess_symptoms(symptoms: List[str]) -> np.ndarray:
-    """Convert symptom list to feature vector"""
-    # Normalize symptoms
-    normalized = [s.lower().replace(" ", "_").replace("-", "_") for s in symptoms]
-    
-    # Create binary feature vector
-    feature_vector = np.zeros(len(ALL_SYMPTOMS))
-    for i, symptom in enumerate(ALL_SYMPTOMS):
-        if symptom in normalized:
-            feature_vector[i] = 1
-    
-    return feature_vector.reshape(1, -1)
+def load_shadow_bundle() -> ModelBundle:
+    """Load and validate the shadow candidate (runs on the shadow thread)"""
+    shadow_bundle = load_bundle(Path(SHADOW_MODEL_PATH), ALL_SYMPTOMS, "c" if MODEL_MMAP else None, COMPILED_FOREST)
+    validate_bundle(shadow_bundle)
+    # Keep sklearn from fanning one shadow call out over every core
+    if hasattr(shadow_bundle.model, "n_jobs"):
+        shadow_bundle.model.n_jobs = 1
+    return shadow_bundle
 
 
-def fallback_prediction(symptoms: List[str]) -> dict:
-    """Fallback prediction when model is not available"""
-    normalized = [s.lower().replace(" ", "_").replace("-", "_") for s in symptoms]
-    
-    # Simple rule-based prediction
-    predictions = []
-    
-    # Common Cold rules
-    cold_symptoms = {"cough", "runny_nose", "sore_throat", "sneezing", "congestion"}
-    cold_match = len(set(normalized) & cold_symptoms)
-    if cold_match > 0:
-        predictions.append(("Common Cold", cold_match / len(cold_symptoms) * 100))
-    
-    # Flu rules
-    flu_symptoms = {"fever", "cough", "fatigue", "muscle_pain", "headache", "chills"}
-    flu_match = len(set(normalized) & flu_symptoms)
-    if flu_match > 0:
-        predictions.append(("Influenza (Flu)", flu_match / len(flu_symptoms) * 100))
-    
-    # Migraine rules
-    migraine_symptoms = {"headache", "nausea", "blurred_vision", "dizziness"}
-    migraine_match = len(set(normalized) & migraine_symptoms)
-    if migraine_match > 0:
-        predictions.append(("Migraine", migraine_match / len(migraine_symptoms) * 100))
-    
-    # Gastritis rules
-    gastritis_symptoms = {"abdominal_pain", "nausea", "vomiting", "loss_of_appetite"}
-    gastritis_match = len(set(normalized) & gastritis_symptoms)
-    if gastritis_match > 0:
-        predictions.append(("Gastritis", gastritis_match / len(gastritis_symptoms) * 100))
-    
-    # Asthma rules
-    asthma_symptoms = {"shortness_of_breath", "cough", "chest_pain", "wheezing"}
-    asthma_match = len(set(normalized) & asthma_symptoms)
-    if asthma_match > 0:
-        predictions.append(("Asthma", asthma_match / len(asthma_symptoms) * 100))
-    
-    # Anxiety rules
-    anxiety_symptoms = {"anxiety", "palpitations", "sweating", "insomnia", "dizziness"}
-    anxiety_match = len(set(normalized) & anxiety_symptoms)
-    if anxiety_match > 0:
-        predictions.append(("Anxiety Disorder", anxiety_match / len(anxiety_symptoms) * 100))
-    
-    # Diabetes rules
-    diabetes_symptoms = {"frequent_urination", "excessive_thirst", "fatigue", "blurred_vision", "weight_loss"}
-    diabetes_match = len(set(normalized) & diabetes_symptoms)
-    if diabetes_match > 0:
-        predictions.append(("Diabetes Type 2", diabetes_match / len(diabetes_symptoms) * 100))
-    
-    # Eczema rules
-    eczema_symptoms = {"skin_rash", "itching", "swelling"}
-    eczema_match = len(set(normalized) & eczema_symptoms)
-    if eczema_match > 0:
-        predictions.append(("Eczema", eczema_match / len(eczema_symptoms) * 100))
-    
-    # Bronchitis rules
-    bronchitis_symptoms = {"cough", "shortness_of_breath", "chest_pain", "fatigue", "fever"}
-    bronchitis_match = len(set(normalized) & bronchitis_symptoms)
-    if bronchitis_match > 0:
-        predictions.append(("Bronchitis", bronchitis_match / len(bronchitis_symptoms) * 100))
-    
-    # Sort by confidence and get top prediction
-    if predictions:
-        predictions.sort(key=lambda x: x[1], reverse=True)
-        disease, confidence = predictions[0]
-    else:
-        disease = "General Health Concern"
-        confidence = 50.0
-    
-    # Get disease info
-    info = DISEASE_INFO.get(disease, {
-        "description": "Please consult a healthcare professional for proper diagnosis.",
-        "precautions": ["Rest well", "Stay hydrated", "Monitor symptoms", "Seek medical advice if symptoms persist"],
-        "specialist": "General Physician"
-    })
-    
-    return {
+def activate_bundle(new_bundle: ModelBundle):
+    """Swap in a validated bundle"""
+    global bundle
+    bundle = new_bundle
+    # Cached predictions belong to the previous model
+    prediction_cache.clear()
+
+
+def serving_bundle() -> Optional[ModelBundle]:
+    """The bundle requests should use: None (fallback) until one has been warmed"""
+    return bundle if model_ready else None
+
+
+def mark_model_ready():
+    """Start serving the active bundle (after startup or a reload has warmed it)"""
+    global model_ready
+    model_ready = True
+    startup_loader.state = "ready"
+    startup_loader.error = None
+    # Loaded only now so it neither slows nor races the primary load
+    if shadow is not None:
+        shadow.start()
+
+
+def current_vocabulary() -> SymptomVocabulary:
+    """Vocabulary of the served model, or the default symptom list"""
+    current = serving_bundle()
+    return current.vocabulary if current is not None else default_vocabulary
+
+
+def symptoms_payload() -> CachedPayload:
+    """Encoded /symptoms body for the current vocabulary, rebuilt when the model changes"""
+    global _symptoms_payload
+    vocabulary = current_vocabulary()
+    cached_vocabulary, payload = _symptoms_payload
+    if cached_vocabulary is not vocabulary:
+        payload = CachedPayload({"symptoms": vocabulary.symptoms, "count": len(vocabulary)})
+        _symptoms_payload = (vocabulary, payload)
+    return payload
+
+
+def catalog_response(payload: CachedPayload, request: Request) -> Response:
+    """Serve a precomputed body, honoring If-None-Match and Accept-Encoding: gzip"""
+    status, body, headers = payload.select(
+        request.headers.get("if-none-match"), request.headers.get("accept-encoding")
+    )
+    return Response(body, status_code=status, media_type="application/json", headers=headers)
+
+
+def preprocess_symptoms(
+    symptoms: List[str],
+    vocabulary: SymptomVocabulary
+) -> Tuple[np.ndarray, List[str], int]:
+    """Convert symptom list to feature vector, also returning unrecognized symptoms and the bitmask"""
+    indices, unknown = vocabulary.lookup(symptoms)
+    row = vocabulary.encode_indices(indices)
+    return row.reshape(1, -1), unknown, vocabulary.bitmask(indices)
+
+
+def score_features(model_bundle: ModelBundle, features: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Score a feature matrix, returning N x MAX_TOP_K diseases and confidences"""
+    started = time.perf_counter()
+    best, confidences = model_bundle.rank(features, MAX_TOP_K)
+    ranked_at = time.perf_counter()
+    diseases = model_bundle.decode(best)
+    MODEL_CALL_STEPS["predict"].observe(ranked_at - started)
+    MODEL_CALL_STEPS["decode"].observe(time.perf_counter() - ranked_at)
+    return diseases, confidences
+
+
+async def run_inference(model_bundle: ModelBundle, features: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Run score_features on the inference thread pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(inference_executor, score_features, model_bundle, features)
+
+
+def deadline_for(request: Request) -> float:
+    """perf_counter() time by which this request must be answered"""
+    received_at = request.scope.get(RECEIVED_AT, time.perf_counter())
+    return request_deadline(request.headers.get(DEADLINE_HEADER), received_at, DEADLINE_MS, MAX_DEADLINE_MS)
+
+
+async def admitted_inference(model_bundle: ModelBundle, features: np.ndarray, deadline: float, single_row: bool):
+    """
+    Score features within a pending slot and the deadline, raising LoadShed otherwise
+
+    A single row goes through the micro-batcher (when enabled), which drops
+    it unscored if it is still queued at the deadline. Either way the wait
+    is cut off at the deadline; a model call already running on a thread
+    finishes in the background.
+    """
+    admission.acquire(deadline)
+    try:
+        if single_row and batcher is not None:
+            call = batcher.submit(features[0], model_bundle, deadline)
+        else:
+            call = run_inference(model_bundle, features)
+        return await asyncio.wait_for(call, deadline - time.perf_counter())
+    except (asyncio.TimeoutError, DeadlineExceeded):
+        raise LoadShed("deadline")
+    finally:
+        admission.release()
+
+
+def ranked_row(diseases: np.ndarray, confidences: np.ndarray) -> List[Tuple[str, float]]:
+    """Pair one row of score_features output into (disease, confidence) tuples"""
+    return [(str(disease), float(confidence)) for disease, confidence in zip(diseases, confidences)]
+
+
+def build_prediction(
+    ranked: List[Tuple[str, float]],
+    unknown_symptoms: List[str],
+    top_k: Optional[int] = None,
+    model_version: str = "fallback",
+    default_info: dict = MODEL_DEFAULT_INFO
+) -> dict:
+    """Build a prediction response from (disease, confidence) pairs ranked best first"""
+    disease, confidence = ranked[0]
+    info = DISEASE_INFO.get(disease, default_info)
+
+    prediction = {
         "disease": disease,
-        "confidence": min(round(confidence, 1), 95),  # Cap at 95%
+        "confidence": round(confidence, 1),
         "description": info["description"],
         "precautions": info["precautions"],
-        "specialist": info["specialist"]
+        "specialist": info["specialist"],
+        "unknown_symptoms": unknown_symptoms,
+        "model_version": model_version
     }
 
+    # Only the returned candidates need a specialist lookup
+    if top_k:
+        prediction["differential"] = [
+            {
+                "disease": candidate,
+                "confidence": round(candidate_confidence, 1),
+                "specialist": DISEASE_INFO.get(candidate, default_info)["specialist"]
+            }
+            for candidate, candidate_confidence in ranked[:top_k]
+        ]
+    return prediction
+
+
+def cache_ranking(model_bundle: ModelBundle, key: int, ranked: List[Tuple[str, float]]):
+    """Cache a ranking unless its bundle was swapped out while it was being scored"""
+    if model_bundle is bundle:
+        prediction_cache.put(key, ranked)
+
+
+def cached_prediction(
+    model_bundle: ModelBundle,
+    key: int,
+    unknown_symptoms: List[str],
+    top_k: Optional[int] = None
+) -> Optional[dict]:
+    """Return a cached model prediction for a symptom bitmask, if any"""
+    ranked = prediction_cache.get(key)
+    if ranked is None:
+        return None
+    return build_prediction(ranked, unknown_symptoms, top_k, model_bundle.version)
+
+
+def load_cache_warmup(path: Path) -> List[List[str]]:
+    """
+    Read historical symptom lists for cache warm-up.
+
+    Accepts a JSON array or JSON lines; each entry is either a symptom list
+    or {"symptoms": [...], "count": n}.
+    """
+    with open(path) as f:
+        if path.suffix == ".jsonl":
+            entries = [json.loads(line) for line in f if line.strip()]
+        else:
+            entries = json.load(f)
+
+    symptom_lists = []
+    for entry in entries:
+        if isinstance(entry, dict):
+            symptom_lists.extend([entry.get("symptoms", [])] * int(entry.get("count", 1)))
+        else:
+            symptom_lists.append(entry)
+    return symptom_lists
+
+
+def warm_prediction_cache(model_bundle: ModelBundle, symptom_lists: List[List[str]], limit: int) -> int:
+    """Pre-populate the cache with the most frequent symptom combinations"""
+    if not symptom_lists:
+        return 0
+    vocabulary = model_bundle.vocabulary
+
+    # Count combinations by their encoded bitmask
+    frequency = {}
+    examples = {}
+    for symptoms in symptom_lists:
+        indices, _ = vocabulary.lookup(symptoms)
+        if not indices:
+            continue
+        key = vocabulary.bitmask(indices)
+        frequency[key] = frequency.get(key, 0) + 1
+        examples.setdefault(key, indices)
+
+    keys = sorted(frequency, key=frequency.get, reverse=True)[:min(limit, CACHE_SIZE)]
+    if not keys:
+        return 0
+
+    features = np.stack([vocabulary.encode_indices(examples[key]) for key in keys])
+    diseases, confidences = score_features(model_bundle, features)
+    for row, key in enumerate(keys):
+        cache_ranking(model_bundle, key, ranked_row(diseases[row], confidences[row]))
+    return len(keys)
+
+
+def warm_cache_from_file(model_bundle: ModelBundle):
+    """Warm the prediction cache from ML_CACHE_WARMUP_FILE, if configured"""
+    if not CACHE_WARMUP_FILE:
+        return
+    try:
+        symptom_lists = load_cache_warmup(Path(CACHE_WARMUP_FILE))
+        warmed = warm_prediction_cache(model_bundle, symptom_lists, CACHE_WARMUP_SIZE)
+        print(f"🔥 Warmed prediction cache with {warmed} symptom combinations")
+    except Exception as e:
+        print(f"⚠️ Cache warm-up failed: {e}")
+
+
+class ModelReloader:
+    """Loads, validates and warms a new model artifact in the background, then swaps it in"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.state = "idle"
+        self.last_error: Optional[str] = None
+        self.last_reload_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watch_task: Optional[asyncio.Task] = None
+        self._seen_stat: Optional[Tuple[float, int]] = self._stat()
+
+    def _stat(self) -> Optional[Tuple[float, int]]:
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime, stat.st_size
+
+    def trigger(self) -> asyncio.Task:
+        """Start a reload unless one is already running"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._reload())
+        return self._task
+
+    async def _reload(self):
+        self.state = "loading"
+        stat = self._stat()
+        try:
+            new_bundle = await asyncio.to_thread(self._prepare)
+            current = bundle
+            if model_ready and current is not None and current.version == new_bundle.version:
+                print(f"ℹ️ Model artifact unchanged (version {new_bundle.version})")
+            else:
+                activate_bundle(new_bundle)
+                print(f"🔄 Model reloaded (version {new_bundle.version})")
+                await asyncio.to_thread(warm_cache_from_file, new_bundle)
+                # A pod that started on the fallback (or a failed load) serves the model from now on
+                if not model_ready:
+                    mark_model_ready()
+            self._seen_stat = stat
+            self.state = "idle"
+            self.last_error = None
+            self.last_reload_at = time.time()
+        except Exception as e:
+            # Remember the bad artifact too: the watcher retries once it changes again
+            # (an admin can still retry it directly)
+            self._seen_stat = stat
+            self.state = "failed"
+            self.last_error = str(e)
+            print(f"❌ Model reload failed, keeping current model: {e}")
+
+    def _prepare(self) -> ModelBundle:
+        new_bundle = load_bundle(self.path, ALL_SYMPTOMS, "c" if MODEL_MMAP else None, COMPILED_FOREST)
+        validate_bundle(new_bundle)
+        return new_bundle
+
+    def start_watching(self, interval: float):
+        """Poll the artifact and reload when it changes"""
+        self._watch_task = asyncio.create_task(self._watch(interval))
+
+    async def stop_watching(self):
+        if self._watch_task is not None:
+            self._watch_task.cancel()
+            self._watch_task = None
+
+    async def _watch(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            stat = self._stat()
+            if stat is not None and stat != self._seen_stat:
+                await self.trigger()
+
+    def status(self) -> dict:
+        current = bundle
+        return {
+            "state": self.state,
+            "last_error": self.last_error,
+            "last_reload_at": self.last_reload_at,
+            "watching": self._watch_task is not None,
+            "model": current.info() if current is not None else None
+        }
+
+
+reloader = ModelReloader(MODEL_FILE)
+
+
+class StartupLoader:
+    """
+    Loads and warms the model in the background so the API answers right away.
+
+    Requests get rule-based predictions until ``state`` becomes "ready".
+    Import, load and warm-up durations are kept for the readiness probe.
+    """
+
+    def __init__(self):
+        self.state = "starting"
+        self.error: Optional[str] = None
+        self.timings = {"import_seconds": round(IMPORT_SECONDS, 4)}
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        return model_ready or (self.state == "fallback" and not REQUIRE_MODEL)
+
+    def start(self):
+        """Start loading on the running event loop"""
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        try:
+            # A multi-worker supervisor loads the model before forking
+            if bundle is None:
+                self.state = "loading"
+                await asyncio.to_thread(load_model)
+            current = bundle
+            if current is None:
+                self.state = "fallback" if not MODEL_FILE.exists() else "failed"
+                return
+
+            self.state = "warming"
+            started = time.perf_counter()
+            await asyncio.to_thread(warm_cache_from_file, current)
+            # The first call on the inference pool pays for starting its threads
+            features, _ = current.vocabulary.encode_batch([current.symptom_list[:1]])
+            await run_inference(current, features)
+            self.timings["warmup_seconds"] = round(time.perf_counter() - started, 4)
+
+            mark_model_ready()
+            self.timings["ready_seconds"] = round(time.perf_counter() - _import_started, 4)
+            print(f"✅ Ready in {self.timings['ready_seconds']:.2f}s since import ({self.timings})")
+        except Exception as e:
+            self.state = "failed"
+            self.error = str(e)
+            print(f"❌ Startup failed, serving fallback predictions: {e}")
+
+    def status(self) -> dict:
+        current = bundle
+        return {
+            "status": "ready" if self.ready else "not ready",
+            "state": self.state,
+            "error": self.error,
+            "model_version": current.version if current is not None else None,
+            "timings": self.timings
+        }
+
+
+startup_loader = StartupLoader()
+
+
+def fallback_rankings(
+    symptom_lists: List[List[str]],
+    top_k: int = 1
+) -> List[Tuple[List[Tuple[str, float]], List[str]]]:
+    """Rule-based (disease, confidence) rankings and unknown symptoms for several symptom lists"""
+    features, unknown = fallback_vocabulary.encode_batch(symptom_lists)
+    rankings = []
+    for ranked, row_unknown in zip(rule_engine.rank(features, top_k=top_k), unknown):
+        # Cap rule confidence at 95%
+        ranked = [(disease, min(confidence, 95)) for disease, confidence in ranked]
+        if not ranked:
+            ranked = [("General Health Concern", 50.0)]
+        rankings.append((ranked, row_unknown))
+    return rankings
+
+
+def fallback_predictions(
+    symptom_lists: List[List[str]],
+    top_ks: Optional[List[Optional[int]]] = None
+) -> List[dict]:
+    """Rule-based predictions for several symptom lists when the model is not available"""
+    top_ks = top_ks or [None] * len(symptom_lists)
+    rankings = fallback_rankings(symptom_lists, max(k or 1 for k in top_ks))
+    return [
+        build_prediction(ranked, unknown, top_k, default_info=FALLBACK_DEFAULT_INFO)
+        for (ranked, unknown), top_k in zip(rankings, top_ks)
+    ]
+
+
+def fallback_prediction(symptoms: List[str], top_k: Optional[int] = None) -> dict:
+    """Fallback prediction when model is not available"""
+    return fallback_predictions([symptoms], [top_k])[0]
+
 
 @app.on_event("startup")
 async def startup_event():
-    """Load model on startup"""
-    load_model()
+    """Start the inference pool and load the model in the background"""
+    global inference_executor, batcher, shadow
+    inference_executor = ThreadPoolExecutor(
+        max_workers=INFERENCE_WORKERS, thread_name_prefix="inference"
+    )
+    if BATCHING_ENABLED:
+        batcher = MicroBatcher(
+            score_features,
+            inference_executor,
+            window_ms=BATCH_WINDOW_MS,
+            max_batch_size=BATCH_MAX_SIZE,
+            max_concurrent=INFERENCE_WORKERS
+        )
+        batcher.start()
+    startup_loader.start()
+    if SHADOW_MODEL_PATH:
+        # Started by startup_loader once the primary model serves
+        shadow = ShadowEvaluator(load_shadow_bundle, SHADOW_SAMPLE_RATE, SHADOW_QUEUE_SIZE)
+    if MODEL_WATCH_SECONDS > 0:
+        reloader.start_watching(MODEL_WATCH_SECONDS)
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the batcher and the inference thread pool"""
+    await startup_loader.stop()
+    await reloader.stop_watching()
+    if batcher is not None:
+        await batcher.stop()
+    if shadow is not None:
+        await shadow.stop()
+    if inference_executor is not None:
+        inference_executor.shutdown(wait=False, cancel_futures=True)
+
+
+def check_admin_token(request: Request, token: Optional[str]):
+    """Reject admin calls without the configured token (or, with none configured, from other hosts)"""
+    if ADMIN_TOKEN:
+        if token != ADMIN_TOKEN:
+            raise HTTPException(status_code=403, detail="Invalid admin token")
+    elif request.client is None or request.client.host not in LOOPBACK_HOSTS:
+        raise HTTPException(status_code=403, detail="Admin endpoints are local-only unless ML_ADMIN_TOKEN is set")
 
 
 @app.get("/", response_model=HealthCheckResponse)
 async def root():
     """Health check endpoint"""
+    # Only a warmed model counts as loaded: until then requests get the fallback
+    current = serving_bundle()
     return {
         "status": "ok",
-        "model_loaded": model is not None,
-        "version": "1.0.0"
+        "model_loaded": current is not None,
+        "version": "1.0.0",
+        "model_version": current.version if current is not None else None
     }
 
 
 @app.get("/health")
 async def health_check():
     """Detailed health check"""
+    current = serving_bundle()
     return {
         "status": "healthy",
-        "model_status": "loaded" if model is not None else "using fallback",
-        "available_symptoms": len(ALL_SYMPTOMS),
-        "available_diseases": len(DISEASE_INFO)
+        "model_status": "loaded" if current is not None else "using fallback",
+        "model_version": current.version if current is not None else None,
+        "ready": startup_loader.ready,
+        "available_symptoms": len(current_vocabulary()),
+        "available_diseases": len(DISEASE_INFO),
+        "worker": {"pid": os.getpid(), **process_memory()}
     }
 
 
-@app.post("/predict", response_model=PredictionResponse)
-async def predict_disease(input_data: SymptomInput):
+@app.get("/health/live")
+async def liveness_probe():
+    """Liveness probe: the process is up and serving requests"""
+    return {"status": "alive"}
+
+
+@app.get("/health/ready")
+async def readiness_probe():
+    """Readiness probe: 200 once the model is loaded and warmed, 503 before"""
+    return JSONResponse(startup_loader.status(), status_code=200 if startup_loader.ready else 503)
+
+
+@app.post("/predict", response_model=PredictionResponse, response_model_exclude_none=True)
+async def predict_disease(input_data: SymptomInput, request: Request):
     """Predict disease based on symptoms"""
+    started = time.perf_counter()
+    PREDICT_STAGES["parse"].observe(started - request.scope.get(RECEIVED_AT, started))
     if not input_data.symptoms:
         raise HTTPException(status_code=400, detail="At least one symptom is required")
     
+    # Use one bundle for the whole request, even if a reload swaps it meanwhile
+    current = serving_bundle()
+    top_k = input_data.top_k
+    fragments = None
+    degraded = False
     try:
-        if model is not None:
+        if current is not None:
             # Use trained model
-            features = preprocess_symptoms(input_data.symptoms)
-            prediction = model.predict(features)[0]
-            probabilities = model.predict_proba(features)[0]
-            confidence = float(max(probabilities) * 100)
-            
-            # Decode disease name
-            if disease_encoder:
-                disease = disease_encoder.inverse_transform([prediction])[0]
-            else:
-                disease = prediction
-            
-            # Get disease info
-            info = DISEASE_INFO.get(disease, {
-                "description": "Please consult a healthcare professional.",
-                "precautions": ["Seek medical advice"],
-                "specialist": "General Physician"
-            })
-            
-            return {
-                "disease": disease,
-                "confidence": round(confidence, 1),
-                "description": info["description"],
-                "precautions": info["precautions"],
-                "specialist": info["specialist"]
-            }
+            features, unknown, key = preprocess_symptoms(input_data.symptoms, current.vocabulary)
+            encoded = time.perf_counter()
+            PREDICT_STAGES["encode"].observe(encoded - started)
+
+            ranked = prediction_cache.get(key)
+            scored = time.perf_counter()
+            PREDICT_STAGES["cache"].observe(scored - encoded)
+            path = "cache"
+            if ranked is None:
+                diseases, confidences = await admitted_inference(
+                    current, features, deadline_for(request), single_row=True
+                )
+                if batcher is None:
+                    diseases, confidences = diseases[0], confidences[0]
+                ranked = ranked_row(diseases, confidences)
+                cache_ranking(current, key, ranked)
+                scored = time.perf_counter()
+                PREDICT_STAGES["inference"].observe(scored - encoded)
+                path = "model"
+
+            payloads, version = model_payloads, current.version
+            fragments = payloads.fragments(ranked, top_k)
+            PREDICT_STAGES["lookup"].observe(time.perf_counter() - scored)
+            if shadow is not None:
+                shadow.offer(input_data.symptoms, ranked, version)
         else:
             # Use fallback prediction
-            return fallback_prediction(input_data.symptoms)
+            ranked, unknown = fallback_rankings([input_data.symptoms], top_k or 1)[0]
+            payloads, version = fallback_payloads, "fallback"
+            path = "fallback"
             
+    except LoadShed as shed:
+        # Overloaded or out of time: answer now from the rules rather than late from the model
+        SHED_REQUESTS["predict", shed.reason].inc()
+        ranked, unknown = fallback_rankings([input_data.symptoms], top_k or 1)[0]
+        payloads, version, fragments = fallback_payloads, "fallback", None
+        degraded = True
+        path = "degraded"
     except Exception as e:
+        PREDICTION_ERRORS["predict"].inc()
         print(f"Prediction error: {e}")
         # Return fallback on error
-        return fallback_prediction(input_data.symptoms)
+        ranked, unknown = fallback_rankings([input_data.symptoms], top_k or 1)[0]
+        payloads, version, fragments = fallback_payloads, "fallback", None
+        path = "fallback"
+    PREDICTIONS["predict", path].inc()
 
+    # Splice the per-request fields into the pre-encoded disease details
+    # (same JSON as PredictionResponse, without a pydantic round trip)
+    serialize_started = time.perf_counter()
+    body = payloads.render(ranked, unknown, top_k, version, fragments, degraded)
+    PREDICT_STAGES["serialize"].observe(time.perf_counter() - serialize_started)
+    return Response(body, media_type="application/json")
+
+
+@app.post("/predict/batch", response_model=BatchPredictionResponse, response_model_exclude_none=True)
+async def predict_disease_batch(input_data: BatchSymptomInput, request: Request):
+    """Predict diseases for several symptom lists with a single model call"""
+    items = input_data.items
+    if not items:
+        raise HTTPException(status_code=400, detail="At least one item is required")
+    if len(items) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch size {len(items)} exceeds the limit of {MAX_BATCH_SIZE}"
+        )
+
+    results = [None] * len(items)
+    top_ks = [item.top_k or input_data.top_k for item in items]
+    shed = []
+
+    current = serving_bundle()
+    if current is not None:
+        try:
+            # Answer repeated combinations from the cache and score the rest together.
+            # Items without symptoms can't be scored by the model.
+            vocabulary = current.vocabulary
+            pending = []
+            for i, item in enumerate(items):
+                if not item.symptoms:
+                    continue
+                indices, unknown = vocabulary.lookup(item.symptoms)
+                key = vocabulary.bitmask(indices)
+                results[i] = cached_prediction(current, key, unknown, top_ks[i])
+                if results[i] is None:
+                    pending.append((i, indices, unknown, key))
+            PREDICTIONS["predict_batch", "cache"].inc(sum(result is not None for result in results))
+
+            if pending:
+                features = np.stack([vocabulary.encode_indices(indices) for _, indices, _, _ in pending])
+                try:
+                    diseases, confidences = await admitted_inference(
+                        current, features, deadline_for(request), single_row=False
+                    )
+                except LoadShed as e:
+                    SHED_REQUESTS["predict_batch", e.reason].inc()
+                    shed = [i for i, _, _, _ in pending]
+                    pending = []
+                for row, (i, _, unknown, key) in enumerate(pending):
+                    ranked = ranked_row(diseases[row], confidences[row])
+                    cache_ranking(current, key, ranked)
+                    results[i] = build_prediction(ranked, unknown, top_ks[i], current.version)
+                    if shadow is not None:
+                        shadow.offer(items[i].symptoms, ranked, current.version)
+                PREDICTIONS["predict_batch", "model"].inc(len(pending))
+        except Exception as e:
+            PREDICTION_ERRORS["predict_batch"].inc()
+            print(f"Batch prediction error: {e}")
+
+    # Per-item fallback for anything the model didn't score
+    missing = [i for i, result in enumerate(results) if result is None]
+    if missing:
+        PREDICTIONS["predict_batch", "fallback"].inc(len(missing) - len(shed))
+        PREDICTIONS["predict_batch", "degraded"].inc(len(shed))
+        fallbacks = fallback_predictions(
+            [items[i].symptoms for i in missing], [top_ks[i] for i in missing]
+        )
+        for i, fallback in zip(missing, fallbacks):
+            results[i] = fallback
+        for i in shed:
+            results[i]["degraded"] = True
 
-@app.get("/symptoms")
-async def get_symptoms():
-    """Get list of all recognized symptoms"""
     return {
-        "symptoms": ALL_SYMPTOMS,
-        "count": len(ALL_SYMPTOMS)
+        "predictions": results,
+        "count": len(results)
     }
 
 
-@app.get("/diseases")
-async def get_diseases():
-    """Get list of all diseases with their information"""
+async def session_prediction(session: SymptomSession) -> bytes:
+    """
+    /predict response body for a session's current symptoms
+
+    Scores the session's already-encoded row, or takes the ranking from the
+    prediction cache when the same symptom combination was scored before.
+    """
+    current = serving_bundle()
+    top_k = session.top_k
+    unknown = session.unknown_symptoms()
+    fragments = None
+    degraded = False
+    try:
+        if current is not None and session.vocabulary is current.vocabulary:
+            # Read before awaiting: another message may change the session meanwhile
+            key, features, symptoms = session.key, session.features(), session.symptoms()
+            ranked = prediction_cache.get(key)
+            path = "cache"
+            if ranked is None:
+                diseases, confidences = await admitted_inference(
+                    current, features, request_deadline(None, time.perf_counter(), DEADLINE_MS, MAX_DEADLINE_MS),
+                    single_row=True
+                )
+                if batcher is None:
+                    diseases, confidences = diseases[0], confidences[0]
+                ranked = ranked_row(diseases, confidences)
+                cache_ranking(current, key, ranked)
+                path = "model"
+            payloads, version = model_payloads, current.version
+            fragments = payloads.fragments(ranked, top_k)
+            if shadow is not None:
+                shadow.offer(symptoms, ranked, version)
+        else:
+            ranked, unknown = fallback_rankings([session.symptoms() + unknown], top_k or 1)[0]
+            payloads, version = fallback_payloads, "fallback"
+            path = "fallback"
+    except LoadShed as shed:
+        SHED_REQUESTS["predict_ws", shed.reason].inc()
+        ranked, unknown = fallback_rankings([session.symptoms() + unknown], top_k or 1)[0]
+        payloads, version, fragments = fallback_payloads, "fallback", None
+        degraded = True
+        path = "degraded"
+    except Exception as e:
+        PREDICTION_ERRORS["predict_ws"].inc()
+        print(f"Session prediction error: {e}")
+        ranked, unknown = fallback_rankings([session.symptoms() + unknown], top_k or 1)[0]
+        payloads, version, fragments = fallback_payloads, "fallback", None
+        path = "fallback"
+    PREDICTIONS["predict_ws", path].inc()
+    return payloads.render(ranked, unknown, top_k, version, fragments, degraded)
+
+
+@app.websocket("/ws/conversations/{conversation_id}")
+async def conversation_socket(websocket: WebSocket, conversation_id: str):
+    """
+    Incremental predictions for one conversation
+
+    Each message is a SymptomDelta ({"add": [...], "remove": [...], "reset", "top_k"})
+    and is answered with {"type": "prediction", "symptoms": [...], "prediction": {...}}.
+    The session outlives the connection, so a client reconnecting with the
+    same conversation id gets its last prediction pushed right away.
+    """
+    await websocket.accept()
+    session = sessions.get(conversation_id)
+    conversation = dumps(conversation_id)
+
+    async def push():
+        if not session.indices and not session.unknown:
+            message = b'{"type":"prediction","conversation_id":' + conversation + b',"symptoms":[],"prediction":null}'
+        else:
+            body = await session_prediction(session)
+            message = (
+                b'{"type":"prediction","conversation_id":' + conversation
+                + b',"symptoms":' + dumps(session.symptoms()) + b',"prediction":' + body + b"}"
+            )
+        await websocket.send_text(message.decode())
+
+    try:
+        if session.indices or session.unknown:
+            session.bind(current_vocabulary())
+            await push()
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            text = message.get("text")
+            if text is None:
+                await websocket.send_text('{"type":"error","detail":"Expected a JSON text frame"}')
+                continue
+            try:
+                delta = SymptomDelta.model_validate_json(text)
+            except ValidationError as e:
+                await websocket.send_text(json.dumps({"type": "error", "detail": e.errors(include_url=False)}, default=str))
+                continue
+
+            sessions.touch(session)
+            # Re-encodes only if the model changed since the last message
+            session.bind(current_vocabulary())
+            if delta.reset:
+                session.reset()
+            session.remove(delta.remove)
+            session.add(delta.add)
+            if delta.top_k is not None:
+                session.top_k = delta.top_k
+            await push()
+    except WebSocketDisconnect:
+        pass
+
+
+@app.get("/sessions/stats")
+async def session_stats():
+    """Conversation sessions held for the WebSocket endpoint"""
+    return sessions.stats()
+
+
+@app.post("/admin/reload", status_code=202)
+async def reload_model(request: Request, wait: bool = False, x_admin_token: Optional[str] = Header(default=None)):
+    """Load, validate and warm the model artifact in the background, then swap it in"""
+    check_admin_token(request, x_admin_token)
+    task = reloader.trigger()
+    if wait:
+        await asyncio.shield(task)
+    return reloader.status()
+
+
+@app.get("/admin/reload")
+async def reload_status(request: Request, x_admin_token: Optional[str] = Header(default=None)):
+    """State of the last model reload and the active model version"""
+    check_admin_token(request, x_admin_token)
+    return reloader.status()
+
+
+@app.get("/batching/stats")
+async def batching_stats():
+    """Micro-batching configuration with batch-size and queue-wait histograms"""
+    if batcher is None:
+        return {"enabled": False}
+    return {"enabled": True, **batcher.stats()}
+
+
+@app.get("/shadow/stats")
+async def shadow_stats():
+    """Agreement, confidence deltas and latency of the shadow model against the live one"""
+    if shadow is None:
+        return {"enabled": False}
+    return {"enabled": True, **shadow.stats()}
+
+
+@app.get("/admission/stats")
+async def admission_stats():
+    """Pending-slot usage, deadline settings and shed counts"""
     return {
-        "diseases": DISEASE_INFO,
-        "count": len(DISEASE_INFO)
+        **admission.stats(),
+        "default_deadline_ms": DEADLINE_MS,
+        "max_deadline_ms": MAX_DEADLINE_MS,
+        "shed": {f"{endpoint}.{reason}": counter.value for (endpoint, reason), counter in SHED_REQUESTS.items()},
+        "degraded": {endpoint: PREDICTIONS[endpoint, "degraded"].value for endpoint in PREDICTION_ENDPOINTS}
     }
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus metrics: per-stage latency histograms and prediction counters"""
+    extra = [batcher.batch_sizes, batcher.queue_wait, batcher.dropped_rows] if batcher is not None else []
+    if shadow is not None:
+        extra += shadow.metrics()
+    extra += sessions.metrics()
+    return PlainTextResponse(
+        metrics_registry.render(extra), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """Prediction cache size and hit/miss/eviction counters"""
+    return prediction_cache.stats()
+
+
+@app.get("/symptoms")
+async def get_symptoms(request: Request):
+    """Get list of all recognized symptoms"""
+    return catalog_response(symptoms_payload(), request)
+
+
+@app.get("/diseases")
+async def get_diseases(request: Request):
+    """Get list of all diseases with their information"""
+    return catalog_response(diseases_payload, request)
+
+
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    if WORKERS > 1:
+        from serve import run_workers
+        run_workers(
+            app,
+            load_model,
+            host="0.0.0.0",
+            port=8000,
+            workers=WORKERS,
+            cpu_affinity=CPU_AFFINITY,
+            report_seconds=WORKER_REPORT_SECONDS
+        )
+    else:
+        import uvicorn
+        uvicorn.run(app, host="0.0.0.0", port=8000)
 
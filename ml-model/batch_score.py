@@ -0,0 +1,260 @@
+"""
+Batch Scoring
+Score large symptom files offline with the saved model
+
+Streams a CSV or JSONL file in chunks, encodes every chunk with the model's
+symptom vocabulary and scores it with one vectorized ModelBundle.score call,
+the same encoding and label decoding the API uses. Results are appended to
+the output file chunk by chunk, so memory stays bounded by the chunk size
+(times the number of chunks in flight) however large the input is.
+
+Supported inputs:
+
+- JSONL: one object per line with a ``symptoms`` list
+- CSV with a ``symptoms`` column holding a ``;``/``,``/``|`` separated list
+- CSV in the training layouts: one 0/1 column per symptom, or
+  ``Symptom_1 .. Symptom_N`` columns holding symptom names
+
+An ``id`` column (or ``--id-column``) is copied to the output; otherwise rows
+are numbered from 0.
+
+    python batch_score.py history.jsonl scores.csv --top-k 3 --workers 4
+"""
+
+import argparse
+import json
+import os
+import re
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from dataset import LONG_FORMAT_COLUMN, binarize
+from model_bundle import ModelBundle, load_bundle
+from symptom_vocabulary import normalize_symptom
+
+DEFAULT_MODEL_FILE = Path(__file__).parent / "models" / "disease_predictor.joblib"
+DEFAULT_CHUNK_SIZE = 20_000
+LIST_SEPARATORS = re.compile(r"\s*[;,|]\s*")
+
+# Bundle of a pool worker, loaded once by init_worker
+_worker_bundle: Optional[ModelBundle] = None
+
+
+class Chunk:
+    """One slice of the input: row ids plus either symptom lists or a ready feature matrix"""
+
+    def __init__(self, ids: List, symptom_lists: Optional[List[List[str]]] = None, features: Optional[np.ndarray] = None):
+        self.ids = ids
+        self.symptom_lists = symptom_lists
+        self.features = features
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+def open_bundle(model_file: Path) -> ModelBundle:
+    """
+    Load the artifact for batch scoring
+
+    Memory-mapped copy-on-write, so pool workers share the model's arrays, and
+    without the compiled forest engine, which only pays off for small batches.
+    """
+    return load_bundle(model_file, [], mmap_mode="c", compile_forest=False)
+
+
+def split_symptoms(value) -> List[str]:
+    if isinstance(value, (list, tuple)):
+        return [str(item) for item in value if str(item).strip()]
+    if not isinstance(value, str):
+        return []
+    return [item for item in LIST_SEPARATORS.split(value.strip()) if item]
+
+
+def row_ids(frame: pd.DataFrame, id_column: str, offset: int) -> List:
+    if id_column in frame.columns:
+        return frame[id_column].tolist()
+    return list(range(offset, offset + len(frame)))
+
+
+def read_chunks(path: Path, bundle: ModelBundle, chunk_size: int, id_column: str) -> Iterator[Chunk]:
+    """Parse the input lazily, one chunk at a time"""
+    if path.suffix.lower() in (".jsonl", ".ndjson"):
+        frames = pd.read_json(path, lines=True, chunksize=chunk_size, dtype=False)
+    else:
+        frames = pd.read_csv(path, chunksize=chunk_size, dtype=str, skipinitialspace=True)
+
+    offset = 0
+    column_map = None
+    for frame in frames:
+        frame.columns = [str(col).strip() for col in frame.columns]
+        ids = row_ids(frame, id_column, offset)
+        offset += len(frame)
+
+        if "symptoms" in frame.columns:
+            yield Chunk(ids, symptom_lists=[split_symptoms(value) for value in frame["symptoms"]])
+            continue
+
+        value_cols = [col for col in frame.columns if LONG_FORMAT_COLUMN.match(col)]
+        if value_cols:
+            symptom_lists = [
+                [value for value in row if isinstance(value, str) and value.strip()]
+                for row in frame[value_cols].itertuples(index=False)
+            ]
+            yield Chunk(ids, symptom_lists=symptom_lists)
+            continue
+
+        # One-hot layout: map the header onto model columns once
+        if column_map is None:
+            column_map = {
+                col: bundle.vocabulary.index[normalize_symptom(col)]
+                for col in frame.columns
+                if col != id_column and normalize_symptom(col) in bundle.vocabulary.index
+            }
+            if not column_map:
+                raise ValueError(f"{path.name} has no symptoms column and no column matches a model symptom")
+        features = np.zeros((len(frame), len(bundle.vocabulary)), dtype=np.uint8)
+        flags = binarize(frame[list(column_map)].apply(pd.to_numeric, errors="coerce"))
+        for j, i in enumerate(column_map.values()):
+            features[:, i] |= flags[:, j]
+        yield Chunk(ids, features=features)
+
+
+def score_chunk(bundle: ModelBundle, chunk: Chunk, top_k: int) -> Tuple[np.ndarray, np.ndarray, List[List[str]]]:
+    """Encode (if needed) and score a chunk with one model call"""
+    if chunk.features is not None:
+        features, unknown = chunk.features, [[] for _ in range(len(chunk))]
+    else:
+        features, unknown = bundle.vocabulary.encode_batch(chunk.symptom_lists)
+    diseases, confidences = bundle.score(features, top_k)
+    return diseases, confidences, unknown
+
+
+def init_worker(model_file: Path):
+    global _worker_bundle
+    _worker_bundle = open_bundle(model_file)
+
+
+def score_in_worker(chunk: Chunk, top_k: int):
+    return score_chunk(_worker_bundle, chunk, top_k)
+
+
+def result_frame(chunk: Chunk, diseases: np.ndarray, confidences: np.ndarray, unknown: List[List[str]]) -> pd.DataFrame:
+    """One output row per input row; rank 2..k go to disease_2/confidence_2 ... columns"""
+    columns = {"id": chunk.ids, "disease": diseases[:, 0], "confidence": confidences[:, 0].round(2)}
+    for rank in range(1, diseases.shape[1]):
+        columns[f"disease_{rank + 1}"] = diseases[:, rank]
+        columns[f"confidence_{rank + 1}"] = confidences[:, rank].round(2)
+    columns["unknown_symptoms"] = [";".join(names) for names in unknown]
+    return pd.DataFrame(columns)
+
+
+def write_frame(frame: pd.DataFrame, output: Path, first: bool):
+    mode = "w" if first else "a"
+    if output.suffix.lower() in (".jsonl", ".ndjson"):
+        with open(output, mode) as f:
+            frame.to_json(f, orient="records", lines=True, force_ascii=False)
+    else:
+        frame.to_csv(output, mode=mode, header=first, index=False)
+
+
+def score_file(
+    input_path: Path,
+    output_path: Path,
+    model_file: Path = DEFAULT_MODEL_FILE,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    top_k: int = 1,
+    workers: int = 1,
+    id_column: str = "id"
+) -> dict:
+    """
+    Score input_path into output_path and return throughput stats
+
+    With workers > 1 chunks are scored on a process pool. At most two chunks
+    per worker are in flight, and results are written in input order.
+    """
+    started = time.perf_counter()
+    bundle = open_bundle(model_file)
+    print(f"✅ Loaded {bundle.info()['model_type']} ({bundle.version}): "
+          f"{len(bundle.vocabulary)} symptoms, {len(bundle.classes)} diseases")
+    chunks = read_chunks(input_path, bundle, chunk_size, id_column)
+
+    n_rows = 0
+    n_chunks = 0
+
+    def write(chunk: Chunk, result):
+        nonlocal n_rows, n_chunks
+        write_frame(result_frame(chunk, *result), output_path, first=n_chunks == 0)
+        n_rows += len(chunk)
+        n_chunks += 1
+        elapsed = time.perf_counter() - started
+        print(f"   {n_rows:,} rows scored ({n_rows / elapsed:,.0f} rows/s)", end="\r", flush=True)
+
+    if workers <= 1:
+        for chunk in chunks:
+            write(chunk, score_chunk(bundle, chunk, top_k))
+    else:
+        with ProcessPoolExecutor(workers, initializer=init_worker, initargs=(model_file,)) as pool:
+            in_flight = deque()
+            for chunk in chunks:
+                in_flight.append((chunk, pool.submit(score_in_worker, chunk, top_k)))
+                if len(in_flight) >= 2 * workers:
+                    chunk, future = in_flight.popleft()
+                    write(chunk, future.result())
+            while in_flight:
+                chunk, future = in_flight.popleft()
+                write(chunk, future.result())
+
+    if n_chunks == 0:
+        # Still leave a (header-only) result behind for empty inputs
+        empty = Chunk([])
+        write_frame(result_frame(empty, np.empty((0, 1), dtype=object), np.empty((0, 1)), []), output_path, True)
+
+    elapsed = time.perf_counter() - started
+    return {
+        "rows": n_rows,
+        "chunks": n_chunks,
+        "seconds": elapsed,
+        "rows_per_second": n_rows / elapsed if elapsed else 0.0,
+        "workers": workers,
+        "model_version": bundle.version
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a CSV/JSONL file of symptom lists with the saved model")
+    parser.add_argument("input", type=Path, help="CSV or JSONL (.jsonl/.ndjson) input")
+    parser.add_argument("output", type=Path, help="CSV or JSONL output, written chunk by chunk")
+    parser.add_argument("--model", type=Path, default=DEFAULT_MODEL_FILE, help="Model artifact to score with")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows scored per model call")
+    parser.add_argument("--top-k", type=int, default=1, help="Ranked diseases written per row")
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="Processes scoring chunks in parallel (0 = one per CPU)"
+    )
+    parser.add_argument("--id-column", default="id", help="Input column copied to the output as id")
+    args = parser.parse_args()
+    if args.chunk_size < 1:
+        parser.error("--chunk-size must be at least 1")
+    if args.top_k < 1:
+        parser.error("--top-k must be at least 1")
+    if args.workers < 0:
+        parser.error("--workers must be 0 (one per CPU) or more")
+
+    if not args.model.exists():
+        raise SystemExit(f"❌ No model at {args.model}; run train_model.py first")
+    workers = args.workers or os.cpu_count() or 1
+
+    print(f"📊 Scoring {args.input} -> {args.output} ({workers} workers, chunks of {args.chunk_size:,})")
+    stats = score_file(args.input, args.output, args.model, args.chunk_size, args.top_k, workers, args.id_column)
+    print(f"\n✅ {stats['rows']:,} rows in {stats['seconds']:.1f}s ({stats['rows_per_second']:,.0f} rows/s)")
+    print(json.dumps(stats))
+
+
+if __name__ == "__main__":
+    main()
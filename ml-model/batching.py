@@ -0,0 +1,171 @@
+"""
+Micro-Batching
+Coalesces concurrent single-row predictions into one model call
+"""
+
+import asyncio
+import time
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from admission import DeadlineExceeded
+from metrics import Counter, Histogram
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+QUEUE_WAIT_BUCKETS = (0.0005, 0.001, 0.002, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5)
+
+
+class MicroBatcher:
+    """
+    Collects rows submitted by concurrent requests and scores them together.
+
+    A batch is dispatched once ``max_batch_size`` rows are waiting or
+    ``window_ms`` has passed since its first row arrived. ``score_fn`` takes
+    a context and an N x F matrix and returns a tuple of length-N arrays;
+    each waiting request gets back its own row of that tuple. Rows submitted
+    with different contexts (e.g. model bundles) are scored separately. Up
+    to ``max_concurrent`` batches are scored at once on ``executor``.
+
+    Rows whose request has stopped waiting (cancelled) or whose deadline
+    passed while queued are dropped when their batch is dispatched, so the
+    model only scores rows someone will read.
+    """
+
+    def __init__(
+        self,
+        score_fn: Callable[[Any, np.ndarray], Tuple[np.ndarray, ...]],
+        executor: Optional[Executor],
+        window_ms: float = 2.0,
+        max_batch_size: int = 32,
+        max_concurrent: int = 1
+    ):
+        self.score_fn = score_fn
+        self.executor = executor
+        self.window = window_ms / 1000
+        self.max_batch_size = max_batch_size
+        self.max_concurrent = max_concurrent
+
+        self.batch_sizes = Histogram(
+            "ml_batch_size", "Rows per micro-batch model call", BATCH_SIZE_BUCKETS
+        )
+        self.queue_wait = Histogram(
+            "ml_batch_queue_wait_seconds", "Time a row waited before its batch was dispatched",
+            QUEUE_WAIT_BUCKETS
+        )
+        self.dropped_rows = Counter(
+            "ml_batch_dropped_rows_total", "Queued rows not scored because their request gave up or expired"
+        )
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._task: Optional[asyncio.Task] = None
+        self._inflight = set()
+
+    def start(self):
+        """Start the collector task on the running event loop"""
+        self._queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(self.max_concurrent)
+        self._task = asyncio.create_task(self._collect())
+
+    async def stop(self):
+        """Stop collecting and fail any rows still waiting"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        while self._queue is not None and not self._queue.empty():
+            _, future, _, _, _ = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Batcher stopped"))
+
+    async def submit(self, row: np.ndarray, context: Any = None, deadline: Optional[float] = None) -> tuple:
+        """
+        Queue one feature row and wait for its scored result
+
+        Raises DeadlineExceeded if the row is still queued at ``deadline``
+        (a perf_counter() time) when its batch is dispatched.
+        """
+        if self._task is None:
+            raise RuntimeError("Batcher is not running")
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((row, future, time.perf_counter(), context, deadline))
+        return await future
+
+    def stats(self) -> dict:
+        """Return the batching configuration and histograms"""
+        return {
+            "window_ms": self.window * 1000,
+            "max_batch_size": self.max_batch_size,
+            "max_concurrent_batches": self.max_concurrent,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "dropped_rows": self.dropped_rows.value,
+            "batch_size": self.batch_sizes.snapshot(),
+            "queue_wait_seconds": self.queue_wait.snapshot()
+        }
+
+    async def _collect(self):
+        """Form batches from the queue and hand them off for scoring"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            window_end = loop.time() + self.window
+
+            while len(batch) < self.max_batch_size:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                remaining = window_end - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            await self._slots.acquire()
+            task = asyncio.create_task(self._score(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _score(self, batch: List[tuple]):
+        """Score one batch and fan the results back to the waiting requests"""
+        try:
+            dispatched = time.perf_counter()
+            groups: Dict[int, List[tuple]] = {}
+            for entry in batch:
+                _, future, queued_at, context, deadline = entry
+                self.queue_wait.observe(dispatched - queued_at)
+                if future.done():
+                    # The request stopped waiting (e.g. its wait_for timed out)
+                    self.dropped_rows.inc()
+                elif deadline is not None and dispatched >= deadline:
+                    self.dropped_rows.inc()
+                    future.set_exception(DeadlineExceeded())
+                else:
+                    groups.setdefault(id(context), []).append(entry)
+
+            loop = asyncio.get_running_loop()
+            for group in groups.values():
+                self.batch_sizes.observe(len(group))
+                features = np.stack([row for row, _, _, _, _ in group])
+                try:
+                    results = await loop.run_in_executor(
+                        self.executor, self.score_fn, group[0][3], features
+                    )
+                except Exception as e:
+                    for _, future, _, _, _ in group:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+
+                for i, (_, future, _, _, _) in enumerate(group):
+                    if not future.done():
+                        future.set_result(tuple(values[i] for values in results))
+        finally:
+            self._slots.release()
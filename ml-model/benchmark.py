@@ -0,0 +1,355 @@
+"""
+Benchmark Suite
+Micro-benchmarks and an in-process load test for the prediction service
+
+Runs entirely locally (no network): the load test drives the FastAPI app
+through httpx's ASGI transport. Results are written as JSON and can be
+compared against a stored baseline:
+
+    python benchmark.py --output baseline.json
+    python benchmark.py --baseline baseline.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import numpy as np
+
+BATCH_SIZES = (1, 32, 256)
+CONCURRENCY_LEVELS = (1, 8, 32)
+LOAD_TEST_REQUESTS = 2000
+WORKLOAD_SIZE = 500
+DEFAULT_THRESHOLD = 0.10
+
+
+def time_call(fn: Callable[[], object], min_time: float = 0.2, repeat: int = 5) -> dict:
+    """Median and best per-call time of fn in milliseconds"""
+    fn()
+    # Pick a loop count that makes each of the repeats take about min_time / repeat
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time / repeat:
+            break
+        number *= 2
+
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - started) / number * 1000)
+    return {"median_ms": statistics.median(samples), "min_ms": min(samples), "calls": number * repeat}
+
+
+def symptom_workload(symptoms: List[str], size: int = WORKLOAD_SIZE, seed: int = 0) -> List[List[str]]:
+    """Reproducible symptom lists of 1-5 symptoms, written the way users type them"""
+    rng = np.random.default_rng(seed)
+    workload = []
+    for _ in range(size):
+        count = int(rng.integers(1, min(5, len(symptoms)) + 1))
+        picked = rng.choice(len(symptoms), size=count, replace=False)
+        workload.append([symptoms[i].replace("_", " ") for i in picked])
+    return workload
+
+
+def cycle(items: list) -> Callable[[], object]:
+    """Return a function yielding the items round robin"""
+    state = {"i": -1}
+
+    def next_item():
+        state["i"] = (state["i"] + 1) % len(items)
+        return items[state["i"]]
+    return next_item
+
+
+def bench_request_path(app_module, quick: bool) -> Dict[str, dict]:
+    """
+    preprocess_symptoms and fallback_prediction on the request path, and
+    rendering a /predict body through pydantic vs the pre-encoded payloads
+    """
+    vocabulary = app_module.current_vocabulary()
+    workload = symptom_workload(vocabulary.symptoms)
+    next_symptoms = cycle(workload)
+    min_time = 0.1 if quick else 0.5
+    # Rankings with a 3-entry differential, as a top_k=3 request returns them
+    next_ranking = cycle([ranked for ranked, _ in app_module.fallback_rankings(workload, 3)])
+    unknown = ["made up symptom"]
+
+    results = {
+        "preprocess_symptoms": time_call(
+            lambda: app_module.preprocess_symptoms(next_symptoms(), vocabulary), min_time
+        ),
+        "fallback_prediction": time_call(
+            lambda: app_module.fallback_prediction(next_symptoms(), 3), min_time
+        ),
+        "response_pydantic": time_call(
+            lambda: app_module.PredictionResponse.model_validate(
+                app_module.build_prediction(next_ranking(), unknown, 3, "benchmark")
+            ).model_dump_json(exclude_none=True),
+            min_time
+        ),
+        "response_payload": time_call(
+            lambda: app_module.model_payloads.render(next_ranking(), unknown, 3, "benchmark"), min_time
+        )
+    }
+    for name, result in results.items():
+        print(f"   {name}: {result['median_ms'] * 1000:.1f} µs")
+    return results
+
+
+def bench_models(batch_sizes, quick: bool) -> Dict[str, dict]:
+    """Serving-path scoring (ModelBundle.score) for each candidate model type"""
+    from sklearn.preprocessing import LabelEncoder
+
+    from model_bundle import ModelBundle, load_engine
+    from symptom_vocabulary import SymptomVocabulary
+    from train_model import candidate_models, load_and_preprocess_data
+
+    X, y, symptom_cols = load_and_preprocess_data()
+    X = np.asarray(X, dtype=np.float64)
+    label_encoder = LabelEncoder()
+    y_encoded = label_encoder.fit_transform(y)
+    rng = np.random.default_rng(0)
+
+    results = {}
+    for name, model in candidate_models().items():
+        started = time.perf_counter()
+        model.fit(X, y_encoded)
+        fit_seconds = time.perf_counter() - started
+        # The API scores on one thread per request; keep forests from fanning out
+        if hasattr(model, "n_jobs"):
+            model.n_jobs = 1
+
+        bundle = ModelBundle(
+            model=model,
+            disease_encoder=label_encoder,
+            symptom_encoder=None,
+            symptom_list=list(symptom_cols),
+            vocabulary=SymptomVocabulary(list(symptom_cols)),
+            version="benchmark",
+            path=Path("benchmark"),
+            loaded_at=time.time(),
+            engine=load_engine({"model": model}, X.shape[1])
+        )
+        model_results = {"fit_seconds": fit_seconds, "engine": bundle.info()["engine"]}
+        for batch_size in batch_sizes:
+            features = X[rng.integers(0, len(X), size=batch_size)]
+            timing = time_call(lambda: bundle.score(features, 10), 0.1 if quick else 0.5)
+            timing["rows_per_s"] = batch_size / (timing["median_ms"] / 1000)
+            model_results[f"batch_{batch_size}"] = timing
+            print(
+                f"   {name} ({model_results['engine']}), batch {batch_size}: "
+                f"{timing['median_ms']:.3f} ms ({timing['rows_per_s']:,.0f} rows/s)"
+            )
+        results[name] = model_results
+    return results
+
+
+def percentile(values: List[float], q: float) -> float:
+    return float(np.percentile(values, q)) * 1000 if values else 0.0
+
+
+async def run_load_level(client, workload: List[List[str]], concurrency: int, requests: int) -> dict:
+    """Send ``requests`` /predict calls from ``concurrency`` concurrent clients"""
+    latencies: List[float] = []
+    errors = 0
+    pending = iter(range(requests))
+
+    async def client_loop():
+        nonlocal errors
+        for i in pending:
+            started = time.perf_counter()
+            response = await client.post("/predict", json={"symptoms": workload[i % len(workload)]})
+            latencies.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": requests,
+        "errors": errors,
+        "rps": requests / elapsed,
+        "mean_ms": statistics.fmean(latencies) * 1000,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99)
+    }
+
+
+async def load_test(app_module, concurrency_levels, requests: int) -> Dict[str, dict]:
+    """In-process HTTP load test against /predict at fixed concurrency levels"""
+    import httpx
+
+    await app_module.app.router.startup()
+    try:
+        loader = app_module.startup_loader
+        while loader.state in ("starting", "loading", "warming"):
+            await asyncio.sleep(0.05)
+        print(f"   serving with {loader.state} model {loader.status()['model_version']}")
+
+        workload = symptom_workload(app_module.current_vocabulary().symptoms, seed=1)
+        transport = httpx.ASGITransport(app=app_module.app)
+        results = {}
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            # Warm up the handler, the micro-batcher and the inference threads
+            await run_load_level(client, workload, max(concurrency_levels), min(requests, 200))
+            for concurrency in concurrency_levels:
+                result = await run_load_level(client, workload, concurrency, requests)
+                results[f"concurrency_{concurrency}"] = result
+                print(
+                    f"   concurrency {concurrency}: {result['rps']:,.0f} req/s, "
+                    f"p50 {result['p50_ms']:.2f} ms, p95 {result['p95_ms']:.2f} ms, "
+                    f"p99 {result['p99_ms']:.2f} ms"
+                )
+        return results
+    finally:
+        await app_module.app.router.shutdown()
+
+
+def environment_info() -> dict:
+    """Versions and hardware, so results are only compared like for like"""
+    import sklearn
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=Path(__file__).parent, timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "scikit_learn": sklearn.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count()
+    }
+
+
+def flatten(results: dict, prefix: str = "") -> Dict[str, float]:
+    """Flatten nested results to dotted keys, keeping numeric leaves"""
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(flatten(value, name))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> List[dict]:
+    """
+    Compare latency (``*_ms``) and throughput (``rps``, ``rows_per_s``) metrics.
+
+    A metric regresses when it is more than ``threshold`` worse than the
+    baseline: slower for latencies, lower for throughput.
+    """
+    current_flat = flatten(current["results"])
+    baseline_flat = flatten(baseline["results"])
+    rows = []
+    for key in sorted(current_flat.keys() & baseline_flat.keys()):
+        if key.endswith("_ms"):
+            higher_is_better = False
+        elif key.endswith(("rps", "rows_per_s")):
+            higher_is_better = True
+        else:
+            continue
+        old, new = baseline_flat[key], current_flat[key]
+        if not old:
+            continue
+        change = (new - old) / old
+        worse = -change if higher_is_better else change
+        rows.append({"metric": key, "baseline": old, "current": new, "change": change, "regressed": worse > threshold})
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the disease prediction service")
+    parser.add_argument("--output", type=Path, default=Path(__file__).parent / "benchmark_results.json",
+                        help="Where to write the JSON results")
+    parser.add_argument("--baseline", type=Path, help="Compare against a previous results file")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Relative change counted as a regression (default 0.10)")
+    parser.add_argument("--fail-on-regression", action="store_true",
+                        help="Exit with status 1 if any metric regressed")
+    parser.add_argument("--quick", action="store_true", help="Shorter runs for a fast sanity check")
+    parser.add_argument("--skip", nargs="*", default=[], choices=["request", "models", "load"],
+                        help="Sections to skip")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=list(BATCH_SIZES))
+    parser.add_argument("--concurrency", type=int, nargs="+", default=list(CONCURRENCY_LEVELS))
+    parser.add_argument("--requests", type=int, default=LOAD_TEST_REQUESTS,
+                        help="Requests per concurrency level")
+    parser.add_argument("--with-cache", action="store_true",
+                        help="Keep the prediction cache on during the load test (measures hits, not the model)")
+    args = parser.parse_args()
+
+    # Must be set before the app is imported
+    if not args.with_cache:
+        os.environ["ML_CACHE_SIZE"] = "0"
+    import warnings
+    warnings.filterwarnings("ignore")
+    import app as app_module
+
+    print("=" * 60)
+    print("⏱️ Disease Prediction Benchmarks")
+    print("=" * 60)
+    results = {}
+    requests = args.requests // 4 if args.quick else args.requests
+
+    if "request" not in args.skip:
+        print("\n🔤 Request path")
+        results["request_path"] = bench_request_path(app_module, args.quick)
+    if "models" not in args.skip:
+        print("\n🤖 Model scoring")
+        results["models"] = bench_models(args.batch_sizes, args.quick)
+    if "load" not in args.skip:
+        print(f"\n🚦 Load test: /predict, {requests} requests per level")
+        results["load_test"] = asyncio.run(load_test(app_module, args.concurrency, requests))
+
+    report = {
+        "environment": environment_info(),
+        "config": {
+            "quick": args.quick,
+            "with_cache": args.with_cache,
+            "batching": app_module.BATCHING_ENABLED,
+            "inference_workers": app_module.INFERENCE_WORKERS,
+            "requests_per_level": requests
+        },
+        "results": results
+    }
+    args.output.write_text(json.dumps(report, indent=2))
+    print(f"\n💾 Results saved to: {args.output}")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        rows = compare(report, baseline, args.threshold)
+        print(f"\n📊 Compared with {args.baseline} (commit {baseline['environment'].get('git_commit')}):")
+        for row in rows:
+            marker = "❌" if row["regressed"] else "  "
+            print(f"{marker} {row['metric']}: {row['baseline']:.4g} -> {row['current']:.4g} ({row['change']:+.1%})")
+        regressions = [row for row in rows if row["regressed"]]
+        print(f"\n{'⚠️' if regressions else '✅'} {len(regressions)} of {len(rows)} metrics regressed by more than {args.threshold:.0%}")
+        if regressions and args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
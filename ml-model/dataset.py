@@ -0,0 +1,245 @@
+"""
+Training Data Ingestion
+Streams symptom CSVs in chunks into a compact binary feature matrix
+
+Two layouts are supported:
+
+- wide (Kaggle Training.csv): one 0/1 column per symptom plus a
+  ``prognosis``/``Disease`` column
+- long: ``Disease, Symptom_1, ..., Symptom_17`` with symptom names as values
+
+Only one chunk of parsed CSV is held in memory at a time; the result is a
+uint8 matrix (one byte per symptom flag) rather than pandas int64 columns.
+Parsed results can be cached next to the CSV as .npy files that later runs
+memory-map instead of parsing again.
+"""
+
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CHUNK_SIZE = 50_000
+TARGET_COLUMNS = ("prognosis", "Disease")
+LONG_FORMAT_COLUMN = re.compile(r"^symptom_?\d+$", re.IGNORECASE)
+
+# Bump whenever parsing/binarization changes so existing caches are rebuilt
+PREPROCESSING_VERSION = 1
+
+
+def read_header(path: Path) -> List[str]:
+    """Column names with surrounding whitespace removed"""
+    return [col.strip() for col in pd.read_csv(path, nrows=0).columns]
+
+
+def target_column(columns: List[str]) -> str:
+    for name in TARGET_COLUMNS:
+        if name in columns:
+            return name
+    raise ValueError(f"No target column found (expected one of {', '.join(TARGET_COLUMNS)})")
+
+
+def is_long_format(columns: List[str]) -> bool:
+    """True for Disease, Symptom_1..Symptom_N files whose cells hold symptom names"""
+    return any(LONG_FORMAT_COLUMN.match(col) for col in columns)
+
+
+def binarize(frame: pd.DataFrame) -> np.ndarray:
+    """Flag every non-zero, non-missing cell as 1 (vectorized over the whole chunk)"""
+    if all(pd.api.types.is_numeric_dtype(dtype) for dtype in frame.dtypes):
+        values = frame.to_numpy(dtype=np.float32, na_value=0)
+        return (values != 0).view(np.uint8)
+    # Mixed/text cells: anything present other than 0 or "0" counts
+    present = frame.notna() & frame.ne(0) & frame.ne("0")
+    return present.to_numpy(dtype=np.uint8)
+
+
+def count_lines(path: Path, block_size: int = 1 << 20) -> int:
+    """Newlines in a file plus one: an upper bound on its data rows, read in fixed-size blocks"""
+    lines = 1
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            lines += block.count(b"\n")
+    return lines
+
+
+def read_wide_csv(path: Path, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+    """One-hot symptom columns -> uint8 matrix, labels and symptom names"""
+    columns = read_header(path)
+    target = target_column(columns)
+    # Kaggle's file ends with an empty "Unnamed: 133" column
+    symptom_cols = [col for col in columns if col != target and not col.startswith("Unnamed")]
+
+    # Each chunk is binarized straight into its slice of a preallocated matrix,
+    # so peak memory is the result plus one chunk (not the result twice)
+    capacity = count_lines(path)
+    X = np.zeros((capacity, len(symptom_cols)), dtype=np.uint8)
+    y = np.empty(capacity, dtype=object)
+    n_rows = 0
+    for chunk in pd.read_csv(path, chunksize=chunk_size):
+        chunk.columns = chunk.columns.str.strip()
+        end = n_rows + len(chunk)
+        X[n_rows:end] = binarize(chunk[symptom_cols])
+        y[n_rows:end] = chunk[target].astype(str).str.strip().to_numpy()
+        n_rows = end
+
+    # Drop the unused tail (header and blank lines) in place
+    X.resize((n_rows, len(symptom_cols)), refcheck=False)
+    return X, y[:n_rows].copy(), symptom_cols
+
+
+def read_long_csv(path: Path, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+    """Disease, Symptom_1..Symptom_N rows -> uint8 matrix, labels and (sorted) symptom names"""
+    columns = read_header(path)
+    target = target_column(columns)
+    value_cols = [col for col in columns if LONG_FORMAT_COLUMN.match(col)]
+
+    # Symptom indices in order of first appearance, remapped to sorted order at the end
+    symptom_index: Dict[str, int] = {}
+    row_parts, col_parts, labels = [], [], []
+    n_rows = 0
+    for chunk in pd.read_csv(path, chunksize=chunk_size, dtype=str):
+        chunk.columns = chunk.columns.str.strip()
+        # stack() drops empty cells and yields one (row, symptom name) entry per flag
+        cells = chunk[value_cols].stack().str.strip()
+        cells = cells[cells != ""]
+        for name in pd.unique(cells.to_numpy()):
+            symptom_index.setdefault(name, len(symptom_index))
+
+        rows = chunk.index.get_indexer(cells.index.get_level_values(0))
+        row_parts.append((rows + n_rows).astype(np.int64))
+        col_parts.append(cells.map(symptom_index).to_numpy(dtype=np.int32))
+        labels.append(chunk[target].astype(str).str.strip().to_numpy())
+        n_rows += len(chunk)
+
+    symptom_cols = sorted(symptom_index)
+    order = np.empty(len(symptom_index), dtype=np.int32)
+    order[[symptom_index[name] for name in symptom_cols]] = np.arange(len(symptom_cols), dtype=np.int32)
+
+    X = np.zeros((n_rows, len(symptom_cols)), dtype=np.uint8)
+    for rows, cols in zip(row_parts, col_parts):
+        X[rows, order[cols]] = 1
+    y = np.concatenate(labels) if labels else np.array([], dtype=object)
+    return X, y, symptom_cols
+
+
+def read_training_csv(path: Path, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+    """Read either supported layout into (uint8 features, labels, symptom names)"""
+    if is_long_format(read_header(path)):
+        return read_long_csv(path, chunk_size)
+    return read_wide_csv(path, chunk_size)
+
+
+def deduplicate(X: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Collapse identical (feature row, label) pairs.
+
+    Returns the unique rows, their labels and how many times each occurred,
+    in order of first occurrence.
+    """
+    X = np.ascontiguousarray(X, dtype=np.uint8)
+    _, label_codes = np.unique(y, return_inverse=True)
+    # One fixed-width byte key per row: packed symptom bits followed by the label code
+    keys = np.hstack([np.packbits(X, axis=1), label_codes.astype(">u4").view(np.uint8).reshape(-1, 4)])
+    keys = np.ascontiguousarray(keys).view(np.dtype((np.void, keys.shape[1]))).ravel()
+    _, first, counts = np.unique(keys, return_index=True, return_counts=True)
+    order = np.argsort(first)
+    unique_rows = first[order]
+    return X[unique_rows], np.asarray(y)[unique_rows], counts[order]
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_directory(path: Path) -> Path:
+    """data/cache/<csv name>/ for a CSV in data/"""
+    return path.parent / "cache" / path.stem
+
+
+def read_cache_meta(cache_dir: Path) -> Optional[dict]:
+    try:
+        return json.loads((cache_dir / "meta.json").read_text())
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def source_key(path: Path, meta: Optional[dict]) -> dict:
+    """
+    Content hash and stat of the CSV.
+
+    The hash recorded in the cache is reused while the file's size and
+    modification time are unchanged, so a warm start doesn't read the CSV.
+    """
+    stat = path.stat()
+    key = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    if meta and all(meta.get("source", {}).get(field) == value for field, value in key.items()):
+        key["sha256"] = meta["source"]["sha256"]
+    else:
+        key["sha256"] = file_sha256(path)
+    return key
+
+
+def load_training_data(
+    path: Path,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    use_cache: bool = True
+) -> Tuple[np.ndarray, np.ndarray, List[str], bool]:
+    """
+    Read a training CSV through the preprocessed cache.
+
+    Returns (features, labels, symptom names, cache_hit). On a hit the
+    features and labels are read-only memory maps; a cache built from a
+    different file content or PREPROCESSING_VERSION is rebuilt.
+    """
+    if not use_cache:
+        return (*read_training_csv(path, chunk_size), False)
+
+    cache_dir = cache_directory(path)
+    meta = read_cache_meta(cache_dir)
+    source = source_key(path, meta)
+    if (
+        meta is not None
+        and meta.get("preprocessing_version") == PREPROCESSING_VERSION
+        and meta.get("source", {}).get("sha256") == source["sha256"]
+    ):
+        X = np.load(cache_dir / "features.npy", mmap_mode="r")
+        y = np.load(cache_dir / "labels.npy", mmap_mode="r")
+        if meta.get("source") != source:
+            # Same content, new mtime (e.g. a fresh checkout): record the new stat
+            write_cache_meta(cache_dir, {**meta, "source": source})
+        return X, y, meta["symptom_cols"], True
+
+    X, y, symptom_cols = read_training_csv(path, chunk_size)
+    write_cache(cache_dir, X, y, symptom_cols, source)
+    return X, y, symptom_cols, False
+
+
+def write_cache_meta(cache_dir: Path, meta: dict):
+    tmp_file = cache_dir / "meta.json.tmp"
+    tmp_file.write_text(json.dumps(meta, indent=2))
+    os.replace(tmp_file, cache_dir / "meta.json")
+
+
+def write_cache(cache_dir: Path, X: np.ndarray, y: np.ndarray, symptom_cols: List[str], source: dict):
+    """Write the arrays, then meta.json last so a half-written cache is never used"""
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    (cache_dir / "meta.json").unlink(missing_ok=True)
+    np.save(cache_dir / "features.npy", np.ascontiguousarray(X, dtype=np.uint8))
+    # Fixed-width unicode rather than objects, so labels load without pickle and can be mapped
+    np.save(cache_dir / "labels.npy", np.asarray(y, dtype=str))
+    write_cache_meta(cache_dir, {
+        "preprocessing_version": PREPROCESSING_VERSION,
+        "source": source,
+        "shape": list(X.shape),
+        "symptom_cols": list(symptom_cols)
+    })
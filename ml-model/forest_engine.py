@@ -0,0 +1,207 @@
+"""
+Forest Engine
+Array-based inference for fitted scikit-learn tree ensembles
+
+Flattens every tree of a RandomForest/ExtraTrees/DecisionTree classifier into
+contiguous NumPy arrays and walks all trees for all rows at once. This skips
+sklearn's per-call validation and per-tree Python dispatch, which dominate
+the cost of scoring a single row.
+"""
+
+import time
+from typing import Dict, Optional
+
+import numpy as np
+
+# Arrays that fully describe a compiled forest (saved into the model artifact)
+ARRAY_FIELDS = ("feature", "threshold", "left", "right", "leaf_values", "roots", "classes")
+
+
+class CompiledForest:
+    """
+    A tree ensemble flattened into node arrays.
+
+    Nodes of all trees are concatenated; ``roots`` holds each tree's first
+    node. Leaves point to themselves, so a fixed number of traversal steps
+    (the maximum depth) leaves every row at its leaf. ``leaf_values`` holds
+    each node's normalized class distribution, exactly as sklearn computes
+    it per tree.
+    """
+
+    def __init__(
+        self,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        left: np.ndarray,
+        right: np.ndarray,
+        leaf_values: np.ndarray,
+        roots: np.ndarray,
+        classes: np.ndarray,
+        max_depth: Optional[int] = None
+    ):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.leaf_values = leaf_values
+        self.roots = roots
+        self.classes_ = classes
+        self.max_depth = max_depth if max_depth is not None else self._depth()
+        # Interleaved (left, right) pairs: one gather picks the next node
+        self._children = np.stack([left, right], axis=1).ravel()
+
+    @classmethod
+    def from_estimator(cls, estimator) -> "CompiledForest":
+        """Compile a fitted single-output tree classifier or forest of them"""
+        trees = getattr(estimator, "estimators_", None)
+        if trees is None:
+            trees = [estimator]
+        if not len(trees) or not all(hasattr(tree, "tree_") for tree in trees):
+            raise TypeError(f"{type(estimator).__name__} is not a tree ensemble")
+        if getattr(estimator, "n_outputs_", 1) != 1:
+            raise TypeError("Only single-output classifiers can be compiled")
+        if not hasattr(estimator, "classes_"):
+            raise TypeError(f"{type(estimator).__name__} is not a classifier")
+
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        for tree in trees:
+            t = tree.tree_
+            n_nodes = t.node_count
+            node_ids = np.arange(n_nodes)
+            is_leaf = t.children_left == -1
+
+            features.append(np.where(is_leaf, 0, t.feature))
+            thresholds.append(t.threshold)
+            lefts.append(np.where(is_leaf, node_ids, t.children_left) + offset)
+            rights.append(np.where(is_leaf, node_ids, t.children_right) + offset)
+
+            # Same normalization as DecisionTreeClassifier.predict_proba
+            value = t.value[:, 0, :].astype(np.float64)
+            normalizer = value.sum(axis=1, keepdims=True)
+            normalizer[normalizer == 0.0] = 1.0
+            values.append(value / normalizer)
+
+            roots.append(offset)
+            offset += n_nodes
+
+        return cls(
+            feature=np.concatenate(features).astype(np.intp),
+            threshold=np.concatenate(thresholds).astype(np.float64),
+            left=np.concatenate(lefts).astype(np.intp),
+            right=np.concatenate(rights).astype(np.intp),
+            leaf_values=np.ascontiguousarray(np.concatenate(values)),
+            roots=np.asarray(roots, dtype=np.intp),
+            classes=np.asarray(estimator.classes_)
+        )
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray]) -> "CompiledForest":
+        """Rebuild a compiled forest saved with to_arrays"""
+        return cls(**{name: arrays[name] for name in ARRAY_FIELDS}, max_depth=int(arrays["max_depth"]))
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """Plain arrays for storing in the model artifact (memory-mappable)"""
+        arrays = {name: getattr(self, name if name != "classes" else "classes_") for name in ARRAY_FIELDS}
+        arrays["max_depth"] = np.asarray(self.max_depth)
+        return arrays
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    def _depth(self) -> int:
+        """Number of steps after which every root has reached a leaf"""
+        is_leaf = self.left == np.arange(len(self.left))
+        frontier = self.roots.copy()
+        depth = 0
+        while not is_leaf[frontier].all():
+            frontier = np.unique(np.concatenate([self.left[frontier], self.right[frontier]]))
+            depth += 1
+        return depth
+
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        """Leaf node reached by every row in every tree (N x T)"""
+        # sklearn compares float32 features against float64 thresholds
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n_rows, n_features = X.shape
+        flat_X = X.ravel()
+        row_offsets = (np.arange(n_rows) * n_features)[:, None]
+
+        nodes = np.broadcast_to(self.roots, (n_rows, self.n_trees)).copy()
+        for _ in range(self.max_depth):
+            values = flat_X.take(row_offsets + self.feature.take(nodes))
+            go_right = values > self.threshold.take(nodes)
+            nodes = self._children.take(2 * nodes + go_right)
+        return nodes
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """Class probabilities averaged over trees, matching sklearn's predict_proba"""
+        leaves = self.apply(X)
+        # Accumulate tree by tree in order (cumsum is strictly sequential),
+        # then divide, exactly like the forest does
+        proba = self.leaf_values[leaves].cumsum(axis=1)[:, -1]
+        proba /= self.n_trees
+        return proba
+
+
+def compile_model(model) -> Optional[CompiledForest]:
+    """Compile a model if it is a supported tree ensemble, otherwise return None"""
+    try:
+        return CompiledForest.from_estimator(model)
+    except (TypeError, AttributeError):
+        return None
+
+
+def matches_estimator(engine: CompiledForest, model, n_features: int, n_rows: int = 64) -> bool:
+    """Check the engine against sklearn on random binary rows"""
+    rng = np.random.default_rng(0)
+    X = (rng.random((n_rows, n_features)) < 0.15).astype(np.float64)
+    expected = model.predict_proba(X)
+    return expected.shape == (n_rows, len(engine.classes_)) and np.allclose(
+        engine.predict_proba(X), expected, rtol=0, atol=1e-12
+    )
+
+
+def benchmark(model, n_features: int, batch_sizes=(1, 32, 256), repeat: int = 200) -> list:
+    """Per-call latency of sklearn vs the compiled engine"""
+    engine = CompiledForest.from_estimator(model)
+    rng = np.random.default_rng(0)
+    results = []
+    for batch_size in batch_sizes:
+        X = (rng.random((batch_size, n_features)) < 0.15).astype(np.float64)
+        row = {"batch_size": batch_size}
+        for name, predict in (("sklearn", model.predict_proba), ("compiled", engine.predict_proba)):
+            predict(X)
+            n = max(5, repeat // max(1, batch_size // 32))
+            start = time.perf_counter()
+            for _ in range(n):
+                predict(X)
+            row[f"{name}_ms"] = (time.perf_counter() - start) / n * 1000
+        row["speedup"] = row["sklearn_ms"] / row["compiled_ms"]
+        results.append(row)
+    return results
+
+
+if __name__ == "__main__":
+    import sys
+    from pathlib import Path
+
+    import joblib
+
+    model_file = Path(sys.argv[1]) if len(sys.argv) > 1 else Path(__file__).parent / "models" / "disease_predictor.joblib"
+    saved_data = joblib.load(model_file)
+    model = saved_data["model"]
+    if compile_model(model) is None:
+        sys.exit(f"{type(model).__name__} can't be compiled; only tree ensembles are supported")
+    if hasattr(model, "n_jobs"):
+        model.n_jobs = 1
+
+    n_features = len(saved_data["symptom_list"])
+    print(f"🌲 {type(model).__name__} with {len(getattr(model, 'estimators_', [model]))} trees, {n_features} features")
+    print(f"   identical to sklearn: {matches_estimator(CompiledForest.from_estimator(model), model, n_features)}")
+    for row in benchmark(model, n_features):
+        print(
+            f"   batch {row['batch_size']:>4}: sklearn {row['sklearn_ms']:.3f} ms, "
+            f"compiled {row['compiled_ms']:.3f} ms ({row['speedup']:.1f}x)"
+        )
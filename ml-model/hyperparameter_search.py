@@ -0,0 +1,227 @@
+"""
+Hyperparameter Search
+Successive halving over the candidate model families under a wall-clock budget
+
+Every sampled configuration is first cross-validated on a small share of its
+resource (trees for the ensembles, training rows for the SVM). After each
+round only the best 1/factor of the configurations survive, and they get
+factor times more resource. Rounds run on a joblib process pool, and the
+search stops once the budget is spent, keeping the best configuration of
+the furthest round reached.
+"""
+
+import math
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+from joblib import Parallel, delayed, effective_n_jobs
+from sklearn.base import clone
+from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import ParameterSampler, StratifiedKFold
+from sklearn.svm import SVC
+
+SEARCH_FOLDS = 3
+DEFAULT_FACTOR = 3
+DEFAULT_CONFIGS_PER_FAMILY = 9
+DEFAULT_BUDGET_SECONDS = 600
+# Smallest resource a configuration is ever evaluated with
+MIN_TREES = 5
+MIN_ROWS = 50
+
+# family -> (base estimator, resource that grows per round, sampled parameters, parameters for the final fit)
+SEARCH_SPACE = {
+    "Random Forest": (
+        RandomForestClassifier(random_state=42, n_jobs=1),
+        "n_estimators",
+        {
+            "n_estimators": [50, 100, 200, 300],
+            "max_depth": [None, 8, 10, 16, 24],
+            "min_samples_leaf": [1, 2, 4],
+            "max_features": ["sqrt", "log2", 0.2]
+        },
+        {}
+    ),
+    "Gradient Boosting": (
+        GradientBoostingClassifier(random_state=42),
+        "n_estimators",
+        {
+            "n_estimators": [50, 100, 200],
+            "max_depth": [2, 3, 5],
+            "learning_rate": [0.03, 0.1, 0.3],
+            "subsample": [0.7, 1.0]
+        },
+        {}
+    ),
+    "SVM": (
+        # Accuracy only needs predict(); Platt scaling is turned back on for the final fit
+        SVC(kernel="rbf", random_state=42),
+        "n_samples",
+        {
+            "C": [0.1, 0.3, 1, 3, 10, 30, 100],
+            "gamma": ["scale", 0.001, 0.003, 0.01, 0.03, 0.1]
+        },
+        {"probability": True}
+    )
+}
+
+
+def evaluate_config(config_id, fold, estimator, X, y, train_idx, test_idx, sample_weight=None):
+    """Fit one configuration on one fold and score it (runs in a search worker)"""
+    started = time.time()
+    fit_params = {}
+    if sample_weight is not None:
+        fit_params["sample_weight"] = sample_weight[train_idx]
+    estimator.fit(X[train_idx], y[train_idx], **fit_params)
+    test_weight = sample_weight[test_idx] if sample_weight is not None else None
+    accuracy = accuracy_score(y[test_idx], estimator.predict(X[test_idx]), sample_weight=test_weight)
+    return config_id, fold, accuracy, time.time() - started
+
+
+def sample_configs(configs_per_family: int, random_state: int) -> List[dict]:
+    configs = []
+    for family, (_, resource, space, _) in SEARCH_SPACE.items():
+        for params in ParameterSampler(space, configs_per_family, random_state=random_state):
+            configs.append({"id": len(configs), "family": family, "resource": resource, "params": params})
+    return configs
+
+
+def round_estimator(config: dict, fraction: float):
+    """The configuration with its resource scaled to fraction (number of trees only)"""
+    base = SEARCH_SPACE[config["family"]][0]
+    params = dict(config["params"])
+    if config["resource"] == "n_estimators":
+        params["n_estimators"] = max(MIN_TREES, round(params["n_estimators"] * fraction))
+    return clone(base).set_params(**params)
+
+
+def tuned_model(best: dict):
+    """Unfitted estimator for a search winner, ready for the normal training run"""
+    base, _, _, final_params = SEARCH_SPACE[best["family"]]
+    return clone(base).set_params(**best["params"], **final_params)
+
+
+def successive_halving(
+    X: np.ndarray,
+    y: np.ndarray,
+    sample_weight: Optional[np.ndarray] = None,
+    budget_seconds: float = DEFAULT_BUDGET_SECONDS,
+    n_jobs: int = -1,
+    factor: int = DEFAULT_FACTOR,
+    configs_per_family: int = DEFAULT_CONFIGS_PER_FAMILY,
+    random_state: int = 42
+) -> Dict:
+    """
+    Search SEARCH_SPACE on (X, y) and return the winner and the full trace
+
+    The rounds are sized so the last one evaluates at most factor
+    configurations with their full resource. A round is only started if the
+    previous one would fit in the remaining budget (halving keeps rounds of
+    similar cost), and an unfinished round is cut off at the deadline.
+    """
+    started = time.time()
+    deadline = started + budget_seconds
+    configs = sample_configs(configs_per_family, random_state)
+    n_rounds = max(1, math.ceil(math.log(len(configs), factor)))
+    folds = list(StratifiedKFold(SEARCH_FOLDS, shuffle=True, random_state=random_state).split(X, y))
+    # Row subsets grow as prefixes of one shuffled order, so each round's rows include the last round's
+    position = np.random.RandomState(random_state).permutation(len(X))
+
+    print(
+        f"\n🔎 Successive halving: {len(configs)} configurations, {n_rounds} rounds "
+        f"(factor {factor}), budget {budget_seconds:.0f}s on {effective_n_jobs(n_jobs)} workers"
+    )
+
+    trace = []
+    survivors = configs
+    stopped = "completed"
+    last_round_seconds = 0.0
+    for round_index in range(n_rounds):
+        if round_index and time.time() + last_round_seconds > deadline:
+            stopped = "budget"
+            break
+        round_started = time.time()
+        fraction = float(factor) ** (round_index - n_rounds + 1)
+
+        tasks = []
+        for config in survivors:
+            for fold, (fold_train, fold_test) in enumerate(folds):
+                if config["resource"] == "n_samples":
+                    n_rows = min(len(fold_train), max(MIN_ROWS, round(len(fold_train) * fraction)))
+                    fold_train = fold_train[np.argsort(position[fold_train])[:n_rows]]
+                tasks.append(delayed(evaluate_config)(
+                    config["id"], fold, round_estimator(config, fraction), X, y, fold_train, fold_test, sample_weight
+                ))
+
+        scores: Dict[int, List[float]] = {}
+        fit_seconds: Dict[int, float] = {}
+        # max_nbytes=0 memory-maps the inputs once for the whole pool
+        results = Parallel(n_jobs=n_jobs, max_nbytes=0, return_as="generator_unordered")(tasks)
+        for done, (config_id, _, accuracy, seconds) in enumerate(results, start=1):
+            scores.setdefault(config_id, []).append(accuracy)
+            fit_seconds[config_id] = fit_seconds.get(config_id, 0.0) + seconds
+            if time.time() > deadline and done < len(tasks):
+                # Closing the generator cancels the fits that haven't started
+                results.close()
+                stopped = "budget"
+                break
+
+        # Only configurations scored on every fold take part in the ranking
+        scored = [c for c in survivors if len(scores.get(c["id"], [])) == len(folds)]
+        scored.sort(key=lambda c: np.mean(scores[c["id"]]), reverse=True)
+        promoted = {c["id"] for c in scored[:max(1, len(survivors) // factor)]}
+        for config in scored:
+            estimator = round_estimator(config, fraction)
+            trace.append({
+                "round": round_index,
+                "config": config["id"],
+                "family": config["family"],
+                "params": config["params"],
+                "resource": {
+                    "n_estimators": estimator.get_params()["n_estimators"]
+                } if config["resource"] == "n_estimators" else {
+                    "fraction_of_rows": fraction
+                },
+                "cv_accuracy": float(np.mean(scores[config["id"]])),
+                "fit_seconds": fit_seconds[config["id"]],
+                "promoted": config["id"] in promoted and round_index + 1 < n_rounds
+            })
+
+        last_round_seconds = time.time() - round_started
+        best_score = np.mean(scores[scored[0]["id"]]) if scored else float("nan")
+        print(
+            f"   round {round_index}: {len(scored)}/{len(survivors)} configurations at {fraction:.0%} resource "
+            f"in {last_round_seconds:.1f}s, best CV accuracy {best_score:.4f}"
+        )
+        if stopped == "budget":
+            break
+        survivors = [c for c in scored if c["id"] in promoted]
+
+    best = None
+    if trace:
+        furthest = max(entry["round"] for entry in trace)
+        best_entry = max(
+            (entry for entry in trace if entry["round"] == furthest), key=lambda entry: entry["cv_accuracy"]
+        )
+        best = {key: best_entry[key] for key in ("family", "params", "cv_accuracy", "round", "resource")}
+
+    elapsed = time.time() - started
+    if best is None:
+        print(f"⚠️ Search budget of {budget_seconds:.0f}s ran out before any configuration was scored")
+    else:
+        outcome = "completed" if stopped == "completed" else "hit the budget"
+        print(f"✅ Search {outcome} after {elapsed:.1f}s: {best['family']} {best['params']} "
+              f"(CV accuracy {best['cv_accuracy']:.4f})")
+
+    return {
+        "best": best,
+        "stopped": stopped,
+        "elapsed_seconds": elapsed,
+        "budget_seconds": budget_seconds,
+        "factor": factor,
+        "configs_per_family": configs_per_family,
+        "folds": SEARCH_FOLDS,
+        "rounds": n_rounds,
+        "trace": trace
+    }
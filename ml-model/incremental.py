@@ -0,0 +1,129 @@
+"""
+Incremental Model Updates
+Fold newly confirmed cases into a trained model without a full retrain
+
+Random forests grow a few extra trees on the new rows only and keep every
+existing tree; models with partial_fit (the Naive Bayes candidate) take one
+partial_fit step. A disease the model hasn't seen is appended to the label
+encoder, so existing diseases keep their codes and the existing trees and
+counts stay valid.
+"""
+
+from typing import List, Sequence, Tuple
+
+import numpy as np
+from sklearn.base import clone
+from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+
+from symptom_vocabulary import SymptomVocabulary, normalize_symptom
+
+# Trees added to a forest per update
+DEFAULT_UPDATE_TREES = 10
+
+
+def align_features(X: np.ndarray, columns: Sequence[str], symptom_list: Sequence[str]) -> Tuple[np.ndarray, List[str]]:
+    """
+    Reorder new rows into the model's feature columns
+
+    Column names go through the symptom vocabulary, so synonyms and spelling
+    variants land on the trained column. Returns the aligned uint8 matrix and
+    the columns the model has no feature for (their flags are dropped).
+    """
+    vocabulary = SymptomVocabulary(symptom_list)
+    aligned = np.zeros((len(X), len(symptom_list)), dtype=np.uint8)
+    unknown = []
+    for j, name in enumerate(columns):
+        i = vocabulary.index.get(normalize_symptom(name))
+        if i is None:
+            unknown.append(name)
+        else:
+            aligned[:, i] |= X[:, j]
+    return aligned, unknown
+
+
+def grow_label_encoder(encoder, labels: Sequence[str]) -> Tuple[np.ndarray, List[str]]:
+    """
+    Encode labels, appending diseases the encoder hasn't seen
+
+    Appending (rather than refitting, which sorts) keeps every existing code
+    stable. The grown encoder still decodes with inverse_transform, which is
+    all the API uses; its transform() expects sorted classes, so use the
+    returned codes instead.
+    """
+    known = {name: code for code, name in enumerate(encoder.classes_)}
+    added = [name for name in dict.fromkeys(labels) if name not in known]
+    if added:
+        # Object dtype: classes_ fitted on fixed-width labels (e.g. <U14 from the
+        # dataset cache) would silently truncate longer new names
+        encoder.classes_ = np.concatenate([encoder.classes_.astype(object), np.asarray(added, dtype=object)])
+        known.update({name: len(known) + i for i, name in enumerate(added)})
+    return np.array([known[name] for name in labels], dtype=np.intp), added
+
+
+def expand_tree_classes(tree, present: np.ndarray, n_classes: int):
+    """
+    Widen a fitted decision tree's class axis to n_classes in place
+
+    ``present`` is the class code of each of the tree's current columns.
+    Rebuilds the Cython tree from its pickled state with zero-valued columns
+    for the classes it never saw, so it predicts probability 0 for them.
+    """
+    tree_class, (n_features, _, n_outputs), state = tree.tree_.__reduce__()
+    values = np.zeros((state["values"].shape[0], n_outputs, n_classes))
+    values[:, :, present] = state["values"]
+    expanded = tree_class(n_features, np.array([n_classes], dtype=np.intp), n_outputs)
+    expanded.__setstate__({**state, "values": values})
+    tree.tree_ = expanded
+    tree.classes_ = np.arange(n_classes)
+    tree.n_classes_ = n_classes
+
+
+def update_forest(model, X: np.ndarray, y: np.ndarray, n_classes: int, n_trees: int = DEFAULT_UPDATE_TREES):
+    """
+    Add n_trees trees fitted on (X, y) to a fitted forest in place
+
+    sklearn's warm_start would do the same but requires every fit to see the
+    same classes, which new rows rarely cover, so the trees are grown in a
+    separate forest and merged with their class axes aligned.
+    """
+    grown = clone(model).set_params(
+        n_estimators=n_trees,
+        warm_start=False,
+        # A different seed per update, or every update would draw the same bootstraps
+        random_state=len(model.estimators_)
+    )
+    grown.fit(X, y)
+
+    if model.n_classes_ != n_classes:
+        for tree in model.estimators_:
+            expand_tree_classes(tree, model.classes_, n_classes)
+    for tree in grown.estimators_:
+        expand_tree_classes(tree, grown.classes_, n_classes)
+
+    model.estimators_ = model.estimators_ + grown.estimators_
+    model.n_estimators = len(model.estimators_)
+    model.classes_ = np.arange(n_classes)
+    model.n_classes_ = n_classes
+    return model
+
+
+def update_partial_fit(model, X: np.ndarray, y: np.ndarray, n_classes: int):
+    """partial_fit step, first adding zero counts for new classes (naive Bayes counters)"""
+    n_missing = n_classes - len(model.classes_)
+    if n_missing:
+        if not hasattr(model, "class_count_"):
+            raise ValueError(f"{type(model).__name__} can't learn new diseases incrementally; retrain instead")
+        model.classes_ = np.arange(n_classes)
+        model.class_count_ = np.concatenate([model.class_count_, np.zeros(n_missing)])
+        model.feature_count_ = np.vstack([model.feature_count_, np.zeros((n_missing, model.feature_count_.shape[1]))])
+    model.partial_fit(X, y)
+    return model
+
+
+def apply_update(model, X: np.ndarray, y: np.ndarray, n_classes: int, n_trees: int = DEFAULT_UPDATE_TREES):
+    """Update a fitted model in place with the method it supports; returns (model, method)"""
+    if isinstance(model, (RandomForestClassifier, ExtraTreesClassifier)):
+        return update_forest(model, X, y, n_classes, n_trees), f"forest +{n_trees} trees"
+    if hasattr(model, "partial_fit"):
+        return update_partial_fit(model, X, y, n_classes), "partial_fit"
+    raise ValueError(f"{type(model).__name__} can't be updated incrementally; retrain with train_model.py")
@@ -0,0 +1,144 @@
+"""
+Service Metrics
+Lightweight in-process histograms and counters for the prediction service
+"""
+
+import threading
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Tuple
+
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(labels: Dict[str, str]) -> str:
+    """Render labels in Prometheus text format, e.g. {stage="encode"}"""
+    if not labels:
+        return ""
+    pairs = (f'{key}="{escape_label(value)}"' for key, value in labels.items())
+    return "{" + ",".join(pairs) + "}"
+
+
+def format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Histogram:
+    """Cumulative histogram over fixed bucket upper bounds (Prometheus "le" semantics)"""
+
+    metric_type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        buckets: Iterable[float],
+        labels: Optional[Dict[str, str]] = None
+    ):
+        self.name = name
+        self.description = description
+        self.labels = labels or {}
+        self.buckets = sorted(buckets)
+        # One slot per bucket plus the implicit +Inf bucket
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        # Observations may come from inference threads as well as the event loop
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        """Record one observation"""
+        slot = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[slot] += 1
+            self.sum += value
+            self.count += 1
+
+    def reset(self):
+        """Drop all observations"""
+        with self._lock:
+            self.counts = [0] * (len(self.buckets) + 1)
+            self.sum = 0.0
+            self.count = 0
+
+    def snapshot(self) -> dict:
+        """Return cumulative bucket counts, sum, count and mean"""
+        cumulative = 0
+        buckets = []
+        for bound, count in zip(self.buckets + [float("inf")], self.counts):
+            cumulative += count
+            buckets.append({"le": "+Inf" if bound == float("inf") else bound, "count": cumulative})
+
+        return {
+            "buckets": buckets,
+            "sum": self.sum,
+            "count": self.count,
+            "mean": self.sum / self.count if self.count else 0.0
+        }
+
+    def samples(self) -> List[Sample]:
+        """Bucket, sum and count samples for the text exposition format"""
+        with self._lock:
+            counts, total, count = list(self.counts), self.sum, self.count
+        samples = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + [float("inf")], counts):
+            cumulative += bucket_count
+            samples.append(("_bucket", {**self.labels, "le": format_value(bound)}, cumulative))
+        samples.append(("_sum", self.labels, total))
+        samples.append(("_count", self.labels, count))
+        return samples
+
+
+class Counter:
+    """Monotonically increasing count"""
+
+    metric_type = "counter"
+
+    def __init__(self, name: str, description: str, labels: Optional[Dict[str, str]] = None):
+        self.name = name
+        self.description = description
+        self.labels = labels or {}
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1):
+        with self._lock:
+            self.value += amount
+
+    def samples(self) -> List[Sample]:
+        return [("", self.labels, self.value)]
+
+
+class Registry:
+    """Collection of metrics rendered together for a /metrics endpoint"""
+
+    def __init__(self):
+        self.metrics: List = []
+
+    def register(self, metric):
+        """Add a metric and return it"""
+        self.metrics.append(metric)
+        return metric
+
+    def render(self, extra: Iterable = ()) -> str:
+        """Prometheus text exposition format (version 0.0.4), including any ``extra`` metrics"""
+        families: Dict[str, List] = {}
+        for metric in [*self.metrics, *extra]:
+            families.setdefault(metric.name, []).append(metric)
+
+        lines = []
+        for name, metrics in families.items():
+            lines.append(f"# HELP {name} {metrics[0].description}")
+            lines.append(f"# TYPE {name} {metrics[0].metric_type}")
+            for metric in metrics:
+                for suffix, labels, value in metric.samples():
+                    lines.append(f"{name}{suffix}{format_labels(labels)} {format_value(value)}")
+        return "\n".join(lines) + "\n"
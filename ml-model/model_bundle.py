@@ -0,0 +1,198 @@
+"""
+Model Bundle
+Immutable snapshot of a trained model artifact and everything derived from it
+"""
+
+import hashlib
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from forest_engine import CompiledForest, compile_model, matches_estimator
+from symptom_vocabulary import SymptomVocabulary
+
+# Above this many rows sklearn's own tree traversal is as fast as the compiled engine
+COMPILED_MAX_ROWS = 128
+
+
+def top_classes(probabilities: np.ndarray, top_k: int) -> np.ndarray:
+    """Column indices of the top_k probabilities in each row, best first"""
+    n_rows, n_classes = probabilities.shape
+    k = min(top_k, n_classes)
+    if k == 1:
+        return probabilities.argmax(axis=1)[:, None]
+
+    # Partial sort: only the k winners of each row get fully ordered
+    if k < n_classes:
+        candidates = np.sort(np.argpartition(-probabilities, k - 1, axis=1)[:, :k], axis=1)
+    else:
+        candidates = np.broadcast_to(np.arange(n_classes), (n_rows, n_classes))
+    rows = np.arange(n_rows)[:, None]
+    order = np.argsort(-probabilities[rows, candidates], axis=1, kind="stable")
+    return candidates[rows, order]
+
+
+@dataclass(frozen=True)
+class ModelBundle:
+    """
+    A loaded model together with its encoders and symptom vocabulary.
+
+    Bundles are never mutated: reloading builds a new bundle and swaps the
+    reference, so a request that started on one bundle encodes, scores and
+    decodes with that same bundle.
+    """
+
+    model: Any
+    disease_encoder: Any
+    symptom_encoder: Any
+    symptom_list: List[str]
+    vocabulary: SymptomVocabulary
+    version: str
+    path: Path
+    loaded_at: float
+    engine: Optional[CompiledForest] = None
+
+    @property
+    def classes(self) -> np.ndarray:
+        return self.model.classes_
+
+    def predict_proba(self, features: np.ndarray) -> np.ndarray:
+        """Class probabilities for an N x F feature matrix"""
+        if self.engine is not None and len(features) <= COMPILED_MAX_ROWS:
+            return self.engine.predict_proba(features)
+        return self.model.predict_proba(features)
+
+    def decode(self, class_indices: np.ndarray) -> np.ndarray:
+        """Map model class indices (any shape) to disease names"""
+        predictions = self.classes[class_indices]
+        if self.disease_encoder is None:
+            return predictions
+        return self.disease_encoder.inverse_transform(predictions.ravel()).reshape(predictions.shape)
+
+    def rank(self, features: np.ndarray, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Score features with one predict_proba pass, returning N x k class indices and confidences"""
+        probabilities = self.predict_proba(features)
+        best = top_classes(probabilities, top_k)
+        confidences = probabilities[np.arange(len(best))[:, None], best] * 100
+        return best, confidences
+
+    def score(self, features: np.ndarray, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Like rank, but with the class indices decoded to disease names"""
+        best, confidences = self.rank(features, top_k)
+        return self.decode(best), confidences
+
+    def info(self) -> dict:
+        """Describe the bundle for health and admin endpoints"""
+        return {
+            "version": self.version,
+            "model_type": type(self.model).__name__,
+            "engine": "compiled" if self.engine is not None else "sklearn",
+            "path": str(self.path),
+            "loaded_at": self.loaded_at,
+            "num_symptoms": len(self.vocabulary),
+            "num_diseases": len(self.classes)
+        }
+
+
+def artifact_version(path: Path) -> str:
+    """Short content hash identifying a model artifact"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()[:12]
+
+
+def load_engine(saved_data: dict, n_features: int) -> Optional[CompiledForest]:
+    """
+    Compiled forest for a tree-ensemble artifact, or None for other models.
+
+    Uses the arrays saved by train_model.py when present and compiles the
+    estimator otherwise. The engine is only kept if it reproduces the
+    model's predict_proba.
+    """
+    model = saved_data.get('model')
+    arrays = saved_data.get('compiled_forest')
+    try:
+        engine = CompiledForest.from_arrays(arrays) if arrays else compile_model(model)
+        if engine is None or matches_estimator(engine, model, n_features):
+            return engine
+    except Exception as e:
+        print(f"⚠️ Could not compile {type(model).__name__}: {e}")
+        return None
+    print(f"⚠️ Compiled forest disagrees with {type(model).__name__}, using sklearn inference")
+    return None
+
+
+def load_bundle(
+    path: Path,
+    default_symptoms: Sequence[str],
+    mmap_mode: Optional[str] = None,
+    compile_forest: bool = True
+) -> ModelBundle:
+    """
+    Load a joblib model artifact into a new bundle.
+
+    With ``mmap_mode="c"`` the NumPy arrays stored in an uncompressed artifact
+    are memory-mapped copy-on-write instead of copied, so every process
+    loading the same file shares their pages through the OS page cache
+    ("c" rather than "r" because some Cython estimators need writable
+    buffers even though they never write to them). With ``compile_forest``
+    tree ensembles are scored through the compiled forest engine for small
+    batches.
+    """
+    # Imported here so the API starts without paying for joblib (and the
+    # scikit-learn modules unpickling pulls in) before it can answer probes
+    import joblib
+
+    version = artifact_version(path)
+    saved_data = joblib.load(path, mmap_mode=mmap_mode)
+
+    symptom_list = list(saved_data.get('symptom_list') or default_symptoms)
+    return ModelBundle(
+        model=saved_data.get('model'),
+        disease_encoder=saved_data.get('disease_encoder'),
+        symptom_encoder=saved_data.get('symptom_encoder'),
+        symptom_list=symptom_list,
+        vocabulary=SymptomVocabulary(symptom_list),
+        version=version,
+        path=path,
+        loaded_at=time.time(),
+        engine=load_engine(saved_data, len(symptom_list)) if compile_forest else None
+    )
+
+
+def validate_bundle(bundle: ModelBundle, warmup_symptoms: Optional[List[List[str]]] = None):
+    """
+    Check that a bundle can serve predictions, raising ValueError if not.
+
+    Also runs a few test predictions so the first real request doesn't pay
+    for lazy initialization.
+    """
+    model = bundle.model
+    if model is None or not hasattr(model, "predict_proba"):
+        raise ValueError("Artifact has no model with predict_proba")
+
+    n_features = getattr(model, "n_features_in_", None)
+    if n_features is not None and n_features != len(bundle.symptom_list):
+        raise ValueError(
+            f"Model expects {n_features} features but symptom_list has {len(bundle.symptom_list)}"
+        )
+
+    if bundle.disease_encoder is not None and len(bundle.classes):
+        if int(np.max(bundle.classes)) >= len(bundle.disease_encoder.classes_):
+            raise ValueError("Model classes are not covered by the disease encoder")
+
+    if warmup_symptoms is None:
+        warmup_symptoms = [[name] for name in bundle.symptom_list[:3]] + [bundle.symptom_list[:3]]
+    features, _ = bundle.vocabulary.encode_batch(warmup_symptoms)
+
+    probabilities = bundle.predict_proba(features)
+    if probabilities.shape != (len(features), len(bundle.classes)):
+        raise ValueError(f"Unexpected predict_proba shape {probabilities.shape}")
+    if not np.all(np.isfinite(probabilities)) or not np.allclose(probabilities.sum(axis=1), 1, atol=1e-3):
+        raise ValueError("Model returned invalid probabilities")
+    bundle.decode(probabilities.argmax(axis=1))
@@ -0,0 +1,157 @@
+"""
+Response Payloads
+Pre-serialized JSON for prediction responses and the static catalog endpoints
+
+The description, precautions and specialist of a disease never change
+between requests, so each disease's part of a /predict response is encoded
+to JSON bytes once and spliced together with the per-request fields
+(confidence, unknown symptoms, differential, model version). Catalog bodies
+are encoded and gzipped once and served with an ETag.
+
+orjson is used when installed; the standard library encoder otherwise.
+"""
+
+import gzip
+import hashlib
+import json
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Bodies smaller than this are sent uncompressed: gzip's framing would outweigh the saving
+GZIP_MIN_BYTES = 1024
+
+
+def dumps(value) -> bytes:
+    """Compact JSON bytes (non-ASCII kept as UTF-8, like orjson)"""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def encode_confidence(confidence: float) -> bytes:
+    """A percentage rounded to 1 decimal, as JSON ("95.0" for 95, like the pydantic model)"""
+    # For values in [0, 100] this is exactly how round(confidence, 1) serializes
+    return b"%.1f" % confidence
+
+
+class PredictionPayloads:
+    """
+    Renders /predict responses from per-disease JSON fragments.
+
+    Produces the same JSON as ``PredictionResponse(...).model_dump_json(exclude_none=True)``
+    for a build_prediction dict, with the fields in the same order.
+    """
+
+    def __init__(self, disease_info: Dict[str, dict], default_info: dict):
+        self.disease_info = disease_info
+        self.default_info = default_info
+        self._names: Dict[str, bytes] = {}
+        self._details: Dict[str, bytes] = {}
+        self._specialists: Dict[str, bytes] = {}
+        self._default_details = self._encode_details(default_info)
+        self._default_specialist = dumps(default_info["specialist"])
+        for disease, info in disease_info.items():
+            self._names[disease] = dumps(disease)
+            self._details[disease] = self._encode_details(info)
+            self._specialists[disease] = dumps(info["specialist"])
+
+    @staticmethod
+    def _encode_details(info: dict) -> bytes:
+        return (
+            b',"description":' + dumps(info["description"])
+            + b',"precautions":' + dumps(info["precautions"])
+            + b',"specialist":' + dumps(info["specialist"])
+        )
+
+    def _name(self, disease: str) -> bytes:
+        name = self._names.get(disease)
+        return name if name is not None else dumps(disease)
+
+    def fragments(self, ranked: Sequence[Tuple[str, float]], top_k: Optional[int] = None) -> Tuple[bytes, List[bytes]]:
+        """Precomputed details of the top disease and specialists of the differential"""
+        details = self._details.get(ranked[0][0], self._default_details)
+        specialists = [
+            self._specialists.get(disease, self._default_specialist) for disease, _ in ranked[:top_k or 0]
+        ]
+        return details, specialists
+
+    def render(
+        self,
+        ranked: Sequence[Tuple[str, float]],
+        unknown_symptoms: List[str],
+        top_k: Optional[int] = None,
+        model_version: str = "fallback",
+        fragments: Optional[Tuple[bytes, List[bytes]]] = None,
+        degraded: bool = False
+    ) -> bytes:
+        """JSON body for a ranking, best first (fragments from fragments(), if already looked up)"""
+        details, specialists = fragments or self.fragments(ranked, top_k)
+        disease, confidence = ranked[0]
+        parts = [
+            b'{"disease":', self._name(disease),
+            b',"confidence":', encode_confidence(confidence),
+            details,
+            b',"unknown_symptoms":', dumps(unknown_symptoms) if unknown_symptoms else b"[]"
+        ]
+        if top_k:
+            candidates = [
+                b'{"disease":' + self._name(candidate) + b',"confidence":' + encode_confidence(candidate_confidence)
+                + b',"specialist":' + specialist + b'}'
+                for (candidate, candidate_confidence), specialist in zip(ranked, specialists)
+            ]
+            parts += [b',"differential":[', b",".join(candidates), b"]"]
+        parts += [b',"model_version":', dumps(model_version)]
+        parts.append(b',"degraded":true}' if degraded else b"}")
+        return b"".join(parts)
+
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    """True if an Accept-Encoding header allows gzip: listed (or matched by "*") with q > 0"""
+    qualities = {}
+    for item in (accept_encoding or "").lower().split(","):
+        coding, *params = (part.strip() for part in item.split(";"))
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding:
+            qualities[coding] = quality
+    for coding in ("gzip", "x-gzip", "*"):
+        if coding in qualities:
+            return qualities[coding] > 0
+    return False
+
+
+class CachedPayload:
+    """A JSON body encoded once, with its gzip form and an ETag"""
+
+    def __init__(self, value, cache_control: str = "no-cache"):
+        self.body = dumps(value)
+        self.gzipped = gzip.compress(self.body, mtime=0) if len(self.body) >= GZIP_MIN_BYTES else None
+        # Weak, since the identity and gzip encodings share it
+        self.etag = 'W/"' + hashlib.sha256(self.body).hexdigest()[:16] + '"'
+        self.cache_control = cache_control
+
+    def not_modified(self, if_none_match: Optional[str]) -> bool:
+        """True if an If-None-Match header lists this ETag (weak or strong) or "*" """
+        if not if_none_match:
+            return False
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or self.etag.removeprefix("W/") in tags
+
+    def select(self, if_none_match: Optional[str], accept_encoding: Optional[str]) -> Tuple[int, bytes, Dict[str, str]]:
+        """(status, body, headers) for a request with these headers"""
+        headers = {"ETag": self.etag, "Cache-Control": self.cache_control, "Vary": "Accept-Encoding"}
+        if self.not_modified(if_none_match):
+            return 304, b"", headers
+        if self.gzipped is not None and accepts_gzip(accept_encoding):
+            return 200, self.gzipped, {**headers, "Content-Encoding": "gzip"}
+        return 200, self.body, headers
@@ -0,0 +1,49 @@
+"""
+Rule Engine
+Vectorized rule-based disease scoring used when the ML model is unavailable
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from symptom_vocabulary import SymptomVocabulary
+
+
+class RuleEngine:
+    """
+    Scores diseases by the share of their rule symptoms that are present.
+
+    The rules table (disease -> symptoms) is compiled into a disease x symptom
+    incidence matrix, so scoring N encoded rows is one matrix product and a
+    division by each rule's size.
+    """
+
+    def __init__(self, rules: Dict[str, Sequence[str]], vocabulary: SymptomVocabulary):
+        self.vocabulary = vocabulary
+        self.diseases = list(rules)
+
+        self.incidence = np.zeros((len(self.diseases), len(vocabulary)), dtype=np.float64)
+        for row, disease in enumerate(self.diseases):
+            indices, unknown = vocabulary.lookup(rules[disease])
+            if unknown:
+                raise ValueError(f"Rule for {disease} uses unknown symptoms: {unknown}")
+            self.incidence[row, indices] = 1
+        self.rule_sizes = self.incidence.sum(axis=1)
+
+    def score(self, features: np.ndarray) -> np.ndarray:
+        """Return an N x D matrix of match percentages for encoded feature rows"""
+        matches = np.asarray(features, dtype=np.float64) @ self.incidence.T
+        return matches / self.rule_sizes * 100
+
+    def rank(self, features: np.ndarray, top_k: Optional[int] = None) -> List[List[Tuple[str, float]]]:
+        """Return (disease, score) pairs with a non-zero score per row, best first"""
+        scores = self.score(features)
+        # Stable sort keeps table order among ties
+        order = np.argsort(-scores, axis=1, kind="stable")
+
+        ranked = []
+        for row_scores, row_order in zip(scores, order):
+            matches = [(self.diseases[j], float(row_scores[j])) for j in row_order if row_scores[j] > 0]
+            ranked.append(matches[:top_k] if top_k else matches)
+        return ranked
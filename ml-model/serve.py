@@ -0,0 +1,138 @@
+"""
+Multi-Worker Serving
+Pre-fork supervisor that shares one loaded model across uvicorn workers
+"""
+
+import gc
+import os
+import signal
+import socket
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+
+def process_memory(pid: str = "self") -> dict:
+    """
+    Resident memory of a process in MB (Linux /proc only).
+
+    ``pss_mb`` divides shared pages among the processes mapping them, so
+    summing it over workers gives their real combined footprint.
+    """
+    memory = {}
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    memory["rss_mb"] = round(int(line.split()[1]) / 1024, 1)
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                key = line.split(":")[0]
+                if key in ("Pss", "Shared_Clean", "Shared_Dirty"):
+                    memory[key.lower() + "_mb"] = round(int(line.split()[1]) / 1024, 1)
+    except (FileNotFoundError, PermissionError, ValueError):
+        pass
+    return memory
+
+
+def parse_cpu_affinity(value: Optional[str], workers: int) -> List[Optional[set]]:
+    """
+    Turn ML_CPU_AFFINITY into one CPU set per worker.
+
+    "auto" pins worker i to the i-th available CPU (round robin); a list like
+    "0,2,4" pins workers to those CPUs in order; empty leaves scheduling alone.
+    """
+    if not value:
+        return [None] * workers
+    if value == "auto":
+        cpus = sorted(os.sched_getaffinity(0))
+    else:
+        cpus = [int(cpu) for cpu in value.split(",") if cpu.strip()]
+    return [{cpus[i % len(cpus)]} for i in range(workers)]
+
+
+def run_workers(
+    app,
+    preload: Callable[[], object],
+    host: str,
+    port: int,
+    workers: int,
+    cpu_affinity: Optional[str] = None,
+    report_seconds: float = 0
+):
+    """
+    Serve ``app`` from ``workers`` forked processes sharing one listening socket.
+
+    ``preload`` runs once in the supervisor before forking, so the model's
+    arrays are loaded a single time and shared copy-on-write by every worker.
+    Crashed workers are restarted; SIGINT/SIGTERM stop them all.
+    """
+    import uvicorn
+
+    preload()
+    # Keep the garbage collector from touching (and so copying) preloaded objects
+    gc.freeze()
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+
+    affinity = parse_cpu_affinity(cpu_affinity, workers)
+    children: Dict[int, int] = {}
+    stopping = False
+
+    def spawn(index: int):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            if affinity[index] is not None:
+                os.sched_setaffinity(0, affinity[index])
+            try:
+                config = uvicorn.Config(app, log_level="info")
+                uvicorn.Server(config).run(sockets=[sock])
+            finally:
+                os._exit(0)
+        children[pid] = index
+        pinned = f" on CPU {sorted(affinity[index])}" if affinity[index] else ""
+        print(f"👷 Worker {index} started (pid {pid}){pinned}")
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    for index in range(workers):
+        spawn(index)
+    print(f"🚀 Serving on http://{host}:{port} with {workers} workers")
+
+    if report_seconds > 0:
+        def report():
+            while not stopping:
+                time.sleep(report_seconds)
+                for pid, index in sorted(children.items(), key=lambda item: item[1]):
+                    print(f"📊 Worker {index} (pid {pid}): {process_memory(str(pid))}")
+        threading.Thread(target=report, daemon=True).start()
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        index = children.pop(pid, None)
+        if index is not None and not stopping:
+            print(f"⚠️ Worker {index} (pid {pid}) exited with status {status}, restarting")
+            spawn(index)
+
+    sock.close()
@@ -0,0 +1,166 @@
+"""
+Conversation Sessions
+Per-conversation symptom state for incremental scoring over WebSocket
+
+A chat conversation reveals its symptoms a few at a time. A session keeps
+the conversation's encoded feature row and its bitmask (the prediction
+cache key), and applies add/remove deltas to them bit by bit instead of
+re-encoding the whole list. Sessions live in an LRU store bounded by count
+and idle time.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from metrics import Counter
+from symptom_vocabulary import SymptomVocabulary, normalize_symptom
+
+# Unrecognized symptom names remembered per session (reported back, and looked up
+# again when the model changes)
+MAX_UNKNOWN_SYMPTOMS = 50
+# Longest symptom name a message may send (real names are a few words)
+MAX_SYMPTOM_LENGTH = 100
+
+
+class SymptomSession:
+    """
+    Symptom state of one conversation, encoded for one vocabulary.
+
+    ``row`` is the binary feature row and ``key`` its bitmask. When the model
+    (and so the vocabulary) changes, ``bind`` re-encodes every symptom of the
+    session for the new one: names it lacks move to ``unknown``, and unknown
+    names it recognizes become features.
+    """
+
+    def __init__(self, conversation_id: str):
+        self.conversation_id = conversation_id
+        self.vocabulary: Optional[SymptomVocabulary] = None
+        self.indices: set = set()
+        self.row: Optional[np.ndarray] = None
+        self.key = 0
+        # Normalized name -> name as sent, in arrival order
+        self.unknown: Dict[str, str] = {}
+        self.top_k: Optional[int] = None
+        self.last_used = time.monotonic()
+
+    def bind(self, vocabulary: SymptomVocabulary):
+        """Encode the session for vocabulary, if it isn't already"""
+        if vocabulary is self.vocabulary:
+            return
+        names = self.vocabulary.names(sorted(self.indices)) if self.vocabulary is not None else []
+        names += self.unknown_symptoms()
+        self.vocabulary = vocabulary
+        self.indices = set()
+        self.row = np.zeros(len(vocabulary), dtype=np.uint8)
+        self.key = 0
+        self.unknown = {}
+        self.add(names)
+
+    def add(self, symptoms: Iterable[str]):
+        indices, unknown = self.vocabulary.lookup(symptoms)
+        for i in indices:
+            self.indices.add(i)
+            self.row[i] = 1
+            self.key |= 1 << i
+        for name in unknown:
+            if len(self.unknown) < MAX_UNKNOWN_SYMPTOMS:
+                self.unknown.setdefault(normalize_symptom(name), name)
+
+    def remove(self, symptoms: Iterable[str]):
+        indices, unknown = self.vocabulary.lookup(symptoms)
+        for i in indices:
+            self.indices.discard(i)
+            self.row[i] = 0
+            self.key &= ~(1 << i)
+        for name in unknown:
+            self.unknown.pop(normalize_symptom(name), None)
+
+    def reset(self):
+        self.indices.clear()
+        if self.row is not None:
+            self.row[:] = 0
+        self.key = 0
+        self.unknown.clear()
+
+    def symptoms(self) -> List[str]:
+        """Canonical names of the recognized symptoms, in column order"""
+        return self.vocabulary.names(sorted(self.indices)) if self.vocabulary is not None else []
+
+    def unknown_symptoms(self) -> List[str]:
+        return list(self.unknown.values())
+
+    def features(self) -> np.ndarray:
+        """1 x F copy of the row (the session may change while it is being scored)"""
+        return self.row.reshape(1, -1).copy()
+
+
+class SessionStore:
+    """
+    Conversation sessions in least-recently-used order.
+
+    Sessions idle for more than ``idle_seconds`` are dropped on the next
+    access, and the least recently used one is dropped when ``max_sessions``
+    would be exceeded. Only used from the event loop, so it needs no lock.
+    """
+
+    def __init__(self, max_sessions: int, idle_seconds: float):
+        self.max_sessions = max_sessions
+        self.idle_seconds = idle_seconds
+        self._sessions: OrderedDict = OrderedDict()
+        self.created = Counter("ml_ws_sessions_created_total", "Conversation sessions created")
+        self.evicted = {
+            reason: Counter(
+                "ml_ws_sessions_evicted_total", "Conversation sessions dropped from the session store",
+                {"reason": reason}
+            )
+            for reason in ("idle", "capacity")
+        }
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def metrics(self) -> list:
+        return [self.created, *self.evicted.values()]
+
+    def get(self, conversation_id: str) -> SymptomSession:
+        """The conversation's session, created if it was never seen or was evicted"""
+        session = self._sessions.get(conversation_id)
+        if session is None:
+            session = SymptomSession(conversation_id)
+            self.created.inc()
+        self.touch(session)
+        return session
+
+    def touch(self, session: SymptomSession):
+        """Mark a session used (re-adding it if it was evicted while a client held it)"""
+        session.last_used = time.monotonic()
+        self._sessions[session.conversation_id] = session
+        self._sessions.move_to_end(session.conversation_id)
+        self.evict()
+
+    def evict(self):
+        """Drop idle sessions, then the least recently used ones above max_sessions"""
+        if self.idle_seconds > 0:
+            cutoff = time.monotonic() - self.idle_seconds
+            while self._sessions:
+                oldest = next(iter(self._sessions.values()))
+                if oldest.last_used >= cutoff:
+                    break
+                self._sessions.popitem(last=False)
+                self.evicted["idle"].inc()
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+            self.evicted["capacity"].inc()
+
+    def stats(self) -> dict:
+        self.evict()
+        return {
+            "sessions": len(self._sessions),
+            "max_sessions": self.max_sessions,
+            "idle_seconds": self.idle_seconds,
+            "created": self.created.value,
+            "evicted": {reason: counter.value for reason, counter in self.evicted.items()}
+        }
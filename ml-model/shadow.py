@@ -0,0 +1,183 @@
+"""
+Shadow Evaluation
+Compare a candidate model with the live one on sampled production traffic
+
+A sampled fraction of model-served predictions is mirrored to a second
+model bundle after the primary answer is ready. Mirroring only appends to a
+bounded queue (full means the sample is dropped), and the candidate scores
+the queue on a single low-priority thread, so it never delays or fails a
+response. Top-1 agreement, confidence deltas and the candidate's latency are
+recorded for deciding whether to promote it.
+"""
+
+import asyncio
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
+
+from metrics import Counter, Histogram
+from model_bundle import ModelBundle
+
+# Confidence deltas are in percentage points
+CONFIDENCE_DELTA_BUCKETS = (0.5, 1, 2, 5, 10, 20, 30, 50, 75, 100)
+SHADOW_LATENCY_BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25
+)
+# Disagreements kept for /shadow/stats
+RECENT_DISAGREEMENTS = 20
+
+
+def lower_thread_priority():
+    """Give the calling thread the lowest CPU priority (Linux schedules threads individually)"""
+    try:
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+    except (AttributeError, OSError):
+        pass
+
+
+class ShadowEvaluator:
+    """
+    Scores sampled requests with a candidate bundle and compares it with the primary.
+
+    ``offer`` is called from request handlers on the event loop and only
+    samples and enqueues. The candidate is loaded with ``load_fn`` in the
+    background once started; until then (or if loading fails) offers are
+    ignored.
+    """
+
+    def __init__(self, load_fn: Callable[[], ModelBundle], sample_rate: float, max_queued: int = 1000):
+        self.load_fn = load_fn
+        self.sample_rate = sample_rate
+        self.max_queued = max_queued
+        self.bundle: Optional[ModelBundle] = None
+        self.state = "idle"
+        self.error: Optional[str] = None
+        self.recent_disagreements = deque(maxlen=RECENT_DISAGREEMENTS)
+        self.confidence_delta_sum = 0.0
+
+        self.comparisons = {
+            result: Counter(
+                "ml_shadow_comparisons_total", "Sampled predictions compared with the shadow model",
+                {"result": result}
+            )
+            for result in ("agree", "disagree")
+        }
+        self.confidence_delta = Histogram(
+            "ml_shadow_confidence_delta", "Absolute top-1 confidence difference, shadow vs primary (points)",
+            CONFIDENCE_DELTA_BUCKETS
+        )
+        self.latency = Histogram(
+            "ml_shadow_inference_seconds", "Shadow model time per mirrored request (encode, score, decode)",
+            SHADOW_LATENCY_BUCKETS
+        )
+        self.dropped = Counter("ml_shadow_dropped_total", "Sampled requests dropped because the shadow queue was full")
+        self.errors = Counter("ml_shadow_errors_total", "Shadow scoring failures")
+
+        self._random = random.Random()
+        self._queue: Optional[asyncio.Queue] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def metrics(self) -> list:
+        return [*self.comparisons.values(), self.confidence_delta, self.latency, self.dropped, self.errors]
+
+    def start(self):
+        """Load the candidate and start consuming samples on the running event loop"""
+        if self._task is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queued)
+            self._executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="shadow", initializer=lower_thread_priority
+            )
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self.bundle = None
+
+    def offer(self, symptoms: List[str], ranked: List[Tuple[str, float]], primary_version: str):
+        """Mirror a primary prediction to the shadow model with probability sample_rate"""
+        if self.bundle is None or self._random.random() >= self.sample_rate:
+            return
+        try:
+            self._queue.put_nowait((symptoms, ranked[0], primary_version))
+        except asyncio.QueueFull:
+            self.dropped.inc()
+
+    async def _run(self):
+        self.state = "loading"
+        loop = asyncio.get_running_loop()
+        try:
+            bundle = await loop.run_in_executor(self._executor, self.load_fn)
+        except Exception as e:
+            self.state = "failed"
+            self.error = str(e)
+            print(f"❌ Shadow model failed to load, shadow evaluation disabled: {e}")
+            return
+        self.bundle = bundle
+        self.state = "running"
+        print(f"👥 Shadow model {bundle.version} receiving {self.sample_rate:.0%} of predictions")
+
+        while True:
+            symptoms, primary, primary_version = await self._queue.get()
+            try:
+                shadow, seconds = await loop.run_in_executor(self._executor, self._score, bundle, symptoms)
+            except Exception as e:
+                self.errors.inc()
+                self.error = str(e)
+                continue
+            self._compare(primary, shadow, primary_version, symptoms)
+            self.latency.observe(seconds)
+
+    @staticmethod
+    def _score(bundle: ModelBundle, symptoms: List[str]) -> Tuple[Tuple[str, float], float]:
+        """Top-1 (disease, confidence) from the shadow bundle and the time it took"""
+        started = time.perf_counter()
+        features, _ = bundle.vocabulary.encode_batch([symptoms])
+        diseases, confidences = bundle.score(features, 1)
+        return (str(diseases[0, 0]), float(confidences[0, 0])), time.perf_counter() - started
+
+    def _compare(self, primary: Tuple[str, float], shadow: Tuple[str, float], primary_version: str, symptoms: List[str]):
+        delta = shadow[1] - primary[1]
+        self.confidence_delta_sum += delta
+        self.confidence_delta.observe(abs(delta))
+        if shadow[0] == primary[0]:
+            self.comparisons["agree"].inc()
+            return
+        self.comparisons["disagree"].inc()
+        self.recent_disagreements.append({
+            "symptoms": symptoms,
+            "primary": {"disease": primary[0], "confidence": round(primary[1], 1), "version": primary_version},
+            "shadow": {"disease": shadow[0], "confidence": round(shadow[1], 1)}
+        })
+
+    def stats(self) -> dict:
+        agree = self.comparisons["agree"].value
+        compared = agree + self.comparisons["disagree"].value
+        return {
+            "state": self.state,
+            "error": self.error,
+            "model": self.bundle.info() if self.bundle is not None else None,
+            "sample_rate": self.sample_rate,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "compared": compared,
+            "agreement_rate": agree / compared if compared else None,
+            "mean_confidence_delta": self.confidence_delta_sum / compared if compared else None,
+            "dropped": self.dropped.value,
+            "errors": self.errors.value,
+            "confidence_delta": self.confidence_delta.snapshot(),
+            "latency_seconds": self.latency.snapshot(),
+            "recent_disagreements": list(self.recent_disagreements)
+        }
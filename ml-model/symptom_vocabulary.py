@@ -0,0 +1,124 @@
+"""
+Symptom Vocabulary
+Compiled mapping from symptom names and synonyms to model feature columns
+"""
+
+import re
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+# Groups of names that describe the same symptom. Every name in a group
+# resolves to whichever member of the group the model was trained on, so
+# "rhinorrhea" works against both our symptom list and the Kaggle columns.
+SYMPTOM_SYNONYMS = [
+    ["fever", "high_fever", "pyrexia", "high_temperature"],
+    ["headache", "head_ache", "cephalalgia"],
+    ["cough", "coughing"],
+    ["fatigue", "tiredness", "exhaustion"],
+    ["vomiting", "emesis", "throwing_up"],
+    ["diarrhea", "diarrhoea"],
+    ["shortness_of_breath", "breathlessness", "dyspnea", "difficulty_breathing"],
+    ["dizziness", "lightheadedness", "vertigo"],
+    ["joint_pain", "arthralgia"],
+    ["muscle_pain", "myalgia", "muscle_ache", "body_ache"],
+    ["sore_throat", "throat_pain", "throat_irritation"],
+    ["runny_nose", "rhinorrhea", "rhinorrhoea"],
+    ["skin_rash", "rash"],
+    ["abdominal_pain", "stomach_pain", "stomach_ache", "belly_pain"],
+    ["blurred_vision", "blurry_vision", "blurred_and_distorted_vision"],
+    ["insomnia", "sleeplessness"],
+    ["itching", "itchy_skin", "pruritus"],
+    ["sneezing", "continuous_sneezing"],
+    ["congestion", "nasal_congestion", "stuffy_nose"],
+    ["chills", "shivering"],
+    ["sweating", "perspiration"],
+    ["palpitations", "fast_heart_rate"],
+    ["frequent_urination", "polyuria"],
+    ["excessive_thirst", "polydipsia"],
+    ["tingling", "pins_and_needles"],
+    ["confusion", "disorientation"],
+    ["memory_loss", "forgetfulness"],
+]
+
+_SEPARATORS = re.compile(r"[\s\-_]+")
+
+
+def normalize_symptom(symptom: str) -> str:
+    """Normalize a symptom name to lower snake_case ("Runny-Nose " -> "runny_nose")"""
+    return _SEPARATORS.sub("_", symptom.strip().lower()).strip("_")
+
+
+class SymptomVocabulary:
+    """
+    Maps symptom names and synonyms to feature column indices.
+
+    Built once per symptom list (the model's ``symptom_list``), so encoding a
+    request is a dict lookup per symptom and always follows the trained
+    feature order.
+    """
+
+    def __init__(self, symptom_list: Sequence[str], synonyms: Iterable[List[str]] = SYMPTOM_SYNONYMS):
+        self.symptoms = list(symptom_list)
+        self.size = len(self.symptoms)
+
+        self.index: Dict[str, int] = {}
+        for i, name in enumerate(self.symptoms):
+            self.index.setdefault(normalize_symptom(name), i)
+
+        # Point every synonym at the group member present in this vocabulary
+        for group in synonyms:
+            names = [normalize_symptom(name) for name in group]
+            target = next((self.index[name] for name in names if name in self.index), None)
+            if target is None:
+                continue
+            for name in names:
+                self.index.setdefault(name, target)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def lookup(self, symptoms: Iterable[str]) -> Tuple[List[int], List[str]]:
+        """Return the sorted column indices of known symptoms and the unknown ones"""
+        indices = set()
+        unknown = []
+        for symptom in symptoms:
+            i = self.index.get(normalize_symptom(symptom))
+            if i is None:
+                unknown.append(symptom)
+            else:
+                indices.add(i)
+        return sorted(indices), unknown
+
+    def encode(self, symptoms: Iterable[str]) -> Tuple[np.ndarray, List[str]]:
+        """Encode a symptom list into a binary feature row"""
+        indices, unknown = self.lookup(symptoms)
+        return self.encode_indices(indices), unknown
+
+    def encode_indices(self, indices: List[int]) -> np.ndarray:
+        """Build a binary feature row from column indices"""
+        row = np.zeros(self.size, dtype=np.uint8)
+        row[indices] = 1
+        return row
+
+    @staticmethod
+    def bitmask(indices: Iterable[int]) -> int:
+        """Pack column indices into an integer bitmask (bit i set for column i)"""
+        mask = 0
+        for i in indices:
+            mask |= 1 << i
+        return mask
+
+    def encode_batch(self, symptom_lists: Sequence[Iterable[str]]) -> Tuple[np.ndarray, List[List[str]]]:
+        """Encode several symptom lists into one N x F binary feature matrix"""
+        matrix = np.zeros((len(symptom_lists), self.size), dtype=np.uint8)
+        unknown = []
+        for row, symptoms in enumerate(symptom_lists):
+            indices, row_unknown = self.lookup(symptoms)
+            matrix[row, indices] = 1
+            unknown.append(row_unknown)
+        return matrix, unknown
+
+    def names(self, indices: Iterable[int]) -> List[str]:
+        """Return the canonical symptom names for column indices"""
+        return [self.symptoms[i] for i in indices]
@@ -0,0 +1,80 @@
+"""
+Dataset Tests
+Tests for the CSV readers and row deduplication in dataset.py
+
+    python -m pytest test_dataset.py
+"""
+
+import numpy as np
+
+from dataset import deduplicate, read_long_csv, read_training_csv, read_wide_csv
+
+
+def test_deduplicate_keeps_first_occurrence_order_and_counts():
+    X = np.array([[1, 0, 1], [0, 1, 0], [1, 0, 1], [1, 0, 1], [0, 1, 0]], dtype=np.uint8)
+    y = np.array(["Flu", "Cold", "Flu", "Cold", "Cold"], dtype=object)
+
+    rows, labels, counts = deduplicate(X, y)
+
+    # Same symptoms with a different disease is a different row
+    assert rows.tolist() == [[1, 0, 1], [0, 1, 0], [1, 0, 1]]
+    assert labels.tolist() == ["Flu", "Cold", "Cold"]
+    assert counts.tolist() == [2, 2, 1]
+    assert rows.dtype == np.uint8
+
+
+def test_deduplicate_distinguishes_rows_beyond_one_byte():
+    # Rows differing only past the 8th column must not collapse (symptoms are bit-packed)
+    X = np.zeros((2, 12), dtype=np.uint8)
+    X[1, 11] = 1
+
+    rows, _, counts = deduplicate(X, np.array(["Flu", "Flu"]))
+
+    assert len(rows) == 2
+    assert counts.tolist() == [1, 1]
+
+
+def test_read_long_csv(tmp_path):
+    path = tmp_path / "long.csv"
+    path.write_text(
+        "Disease,Symptom_1,Symptom_2,Symptom_3\n"
+        "Flu , fever, cough,\n"
+        "Cold,cough,,\n"
+        "Migraine, headache ,nausea, fever\n"
+    )
+
+    X, y, symptoms = read_long_csv(path, chunk_size=2)
+
+    assert symptoms == ["cough", "fever", "headache", "nausea"]
+    assert y.tolist() == ["Flu", "Cold", "Migraine"]
+    assert X.dtype == np.uint8
+    assert X.tolist() == [[1, 1, 0, 0], [1, 0, 0, 0], [0, 1, 1, 1]]
+
+
+def test_read_wide_csv_is_independent_of_chunk_size(tmp_path):
+    path = tmp_path / "wide.csv"
+    rng = np.random.default_rng(0)
+    flags = (rng.random((23, 5)) < 0.3).astype(int)
+    lines = ["fever,cough ,rash,nausea,chills,prognosis"]
+    lines += [",".join(map(str, row)) + f",Disease {i % 4} " for i, row in enumerate(flags)]
+    path.write_text("\n".join(lines) + "\n")
+
+    expected, labels, symptoms = read_wide_csv(path, chunk_size=1000)
+    assert symptoms == ["fever", "cough", "rash", "nausea", "chills"]
+    assert expected.tolist() == flags.tolist()
+    assert labels.tolist() == [f"Disease {i % 4}" for i in range(23)]
+
+    for chunk_size in (1, 4, 23):
+        X, y, _ = read_wide_csv(path, chunk_size=chunk_size)
+        assert X.dtype == np.uint8 and X.shape == flags.shape
+        assert np.array_equal(X, expected)
+        assert y.tolist() == labels.tolist()
+
+
+def test_read_training_csv_detects_layout(tmp_path):
+    path = tmp_path / "long.csv"
+    path.write_text("Disease,Symptom_1\nFlu,fever\n")
+
+    X, y, symptoms = read_training_csv(path)
+
+    assert symptoms == ["fever"] and y.tolist() == ["Flu"] and X.tolist() == [[1]]
@@ -0,0 +1,61 @@
+"""
+Forest Engine Tests
+Parity tests for forest_engine.py
+
+    python -m pytest test_forest_engine.py
+"""
+
+import numpy as np
+import pytest
+from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+from sklearn.tree import DecisionTreeClassifier
+
+from forest_engine import CompiledForest, compile_model, matches_estimator
+
+N_FEATURES = 20
+
+
+def training_data(n_rows: int = 300, n_classes: int = 6):
+    rng = np.random.default_rng(1)
+    X = (rng.random((n_rows, N_FEATURES)) < 0.2).astype(np.uint8)
+    # Labels depend on a few columns, with some noise, so trees grow past one split
+    y = (X[:, 0] + 2 * X[:, 1] + 3 * X[:, 2] + rng.integers(0, 2, n_rows)) % n_classes
+    return X, y
+
+
+@pytest.mark.parametrize("model", [
+    RandomForestClassifier(n_estimators=15, random_state=0),
+    ExtraTreesClassifier(n_estimators=15, random_state=0),
+    DecisionTreeClassifier(random_state=0)
+])
+def test_predict_proba_matches_sklearn(model):
+    X, y = training_data()
+    model.fit(X, y)
+    engine = CompiledForest.from_estimator(model)
+
+    assert matches_estimator(engine, model, N_FEATURES)
+    assert np.array_equal(engine.predict_proba(X), model.predict_proba(X))
+    assert np.array_equal(engine.classes_, model.classes_)
+
+
+def test_array_round_trip_keeps_parity():
+    X, y = training_data()
+    model = RandomForestClassifier(n_estimators=10, random_state=0).fit(X, y)
+    engine = CompiledForest.from_arrays(CompiledForest.from_estimator(model).to_arrays())
+
+    assert matches_estimator(engine, model, N_FEATURES)
+
+
+def test_mismatched_model_is_detected():
+    X, y = training_data()
+    model = RandomForestClassifier(n_estimators=10, random_state=0).fit(X, y)
+    other = RandomForestClassifier(n_estimators=10, random_state=1).fit(X, y)
+
+    assert not matches_estimator(CompiledForest.from_estimator(other), model, N_FEATURES)
+
+
+def test_unsupported_model_is_not_compiled():
+    from sklearn.naive_bayes import BernoulliNB
+
+    X, y = training_data()
+    assert compile_model(BernoulliNB().fit(X, y)) is None
@@ -0,0 +1,42 @@
+"""
+Incremental Update Tests
+Regression tests for incremental.py
+
+    python -m pytest test_incremental.py
+"""
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import LabelEncoder
+
+from incremental import apply_update, grow_label_encoder
+
+
+def cached_label_encoder():
+    """An encoder fitted the way train_model.py does on labels read from the dataset cache (<U14)"""
+    labels = np.asarray(["Common Cold", "Migraine", "Bronchitis"], dtype=str)
+    return LabelEncoder().fit(labels)
+
+
+def test_grow_label_encoder_keeps_long_names():
+    encoder = cached_label_encoder()
+    codes, added = grow_label_encoder(encoder, ["Migraine", "Systemic Lupus Erythematosus"])
+
+    assert added == ["Systemic Lupus Erythematosus"]
+    assert list(encoder.inverse_transform(codes)) == ["Migraine", "Systemic Lupus Erythematosus"]
+    # Existing diseases keep their codes
+    assert list(encoder.classes_[:3]) == ["Bronchitis", "Common Cold", "Migraine"]
+
+
+def test_forest_update_decodes_new_disease():
+    encoder = cached_label_encoder()
+    X = np.array([[1, 0, 0], [0, 1, 0], [0, 0, 1]] * 4, dtype=np.uint8)
+    y = encoder.transform(np.array(["Common Cold", "Migraine", "Bronchitis"] * 4))
+    model = RandomForestClassifier(n_estimators=5, random_state=0).fit(X, y)
+
+    new_X = np.array([[1, 1, 1]] * 6, dtype=np.uint8)
+    codes, _ = grow_label_encoder(encoder, ["Systemic Lupus Erythematosus"] * 6)
+    apply_update(model, new_X, codes, len(encoder.classes_), n_trees=5)
+
+    predicted = model.classes_[model.predict_proba(new_X[:1]).argmax(axis=1)]
+    assert encoder.inverse_transform(predicted)[0] == "Systemic Lupus Erythematosus"
@@ -0,0 +1,73 @@
+"""
+Payload Tests
+Pre-serialized responses must match the pydantic models byte for byte
+
+    python -m pytest test_payloads.py
+"""
+
+import pytest
+
+from app import DISEASE_INFO, FALLBACK_DEFAULT_INFO, MODEL_DEFAULT_INFO, PredictionResponse, build_prediction
+from payloads import CachedPayload, PredictionPayloads, accepts_gzip
+
+RANKED = [("Influenza", 61.25), ("Common Cold", 20.0), ("Bronchitis", 9.96), ("Not In Catalog", 0.04)]
+
+
+def expected_json(ranked, unknown_symptoms, top_k, model_version, default_info, degraded=False) -> bytes:
+    prediction = build_prediction(ranked, unknown_symptoms, top_k, model_version, default_info)
+    if degraded:
+        prediction["degraded"] = True
+    return PredictionResponse(**prediction).model_dump_json(exclude_none=True).encode()
+
+
+@pytest.mark.parametrize("ranked", [RANKED, RANKED[::-1], [("Migraine", 100.0)], [("Influenza", 33.35)]])
+@pytest.mark.parametrize("top_k", [None, 1, 3, 10])
+@pytest.mark.parametrize("unknown_symptoms", [[], ["fièvre", 'a "quoted" name']])
+def test_render_matches_pydantic(ranked, top_k, unknown_symptoms):
+    payloads = PredictionPayloads(DISEASE_INFO, MODEL_DEFAULT_INFO)
+
+    assert payloads.render(ranked, unknown_symptoms, top_k, "abc123") == expected_json(
+        ranked, unknown_symptoms, top_k, "abc123", MODEL_DEFAULT_INFO
+    )
+
+
+def test_render_degraded_fallback_matches_pydantic():
+    payloads = PredictionPayloads(DISEASE_INFO, FALLBACK_DEFAULT_INFO)
+
+    assert payloads.render(RANKED[::-1], [], 2, degraded=True) == expected_json(
+        RANKED[::-1], [], 2, "fallback", FALLBACK_DEFAULT_INFO, degraded=True
+    )
+
+
+def test_render_with_prefetched_fragments():
+    payloads = PredictionPayloads(DISEASE_INFO, MODEL_DEFAULT_INFO)
+    fragments = payloads.fragments(RANKED, 3)
+
+    assert payloads.render(RANKED, [], 3, "v1", fragments=fragments) == payloads.render(RANKED, [], 3, "v1")
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, False),
+    ("gzip, deflate, br", True),
+    ("GZIP;q=0.5", True),
+    ("gzip;q=0", False),
+    ("gzip; q=0.0, *", False),
+    ("br, *;q=0.1", True),
+    ("*;q=0", False),
+    ("identity", False)
+])
+def test_accepts_gzip(header, expected):
+    assert accepts_gzip(header) is expected
+
+
+def test_cached_payload_honours_refused_gzip():
+    payload = CachedPayload({"items": ["x" * 10] * 200})
+
+    status, body, headers = payload.select(None, "gzip;q=0, identity")
+    assert status == 200 and body == payload.body and "Content-Encoding" not in headers
+
+    status, body, headers = payload.select(None, "gzip")
+    assert body == payload.gzipped and headers["Content-Encoding"] == "gzip"
+
+    status, body, _ = payload.select(headers["ETag"], "gzip")
+    assert status == 304 and body == b""
@@ -8,31 +8,68 @@ https://www.kaggle.com/datasets/kaushil268/disease-prediction-using-machine-lear
 
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split, cross_val_score
+from sklearn.base import clone
+from sklearn.model_selection import KFold, StratifiedKFold
 from sklearn.preprocessing import LabelEncoder
 from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
 from sklearn.svm import SVC
+from sklearn.naive_bayes import BernoulliNB
 from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
 import joblib
+from joblib import Parallel, delayed, effective_n_jobs
+import argparse
+import io
+import json
+import os
+import time
 from pathlib import Path
 import warnings
+
+from dataset import DEFAULT_CHUNK_SIZE, deduplicate, load_training_data, read_training_csv
+from forest_engine import compile_model
+from hyperparameter_search import DEFAULT_BUDGET_SECONDS, successive_halving, tuned_model
+from incremental import DEFAULT_UPDATE_TREES, align_features, apply_update, grow_label_encoder
+
 warnings.filterwarnings('ignore')
 
 # Paths
 DATA_PATH = Path(__file__).parent / "data"
 MODEL_PATH = Path(__file__).parent / "models"
 
+# Cross-validation folds per candidate model
+CV_FOLDS = 5
+
+# Rows per call for the batch latency measured during model selection
+SELECTION_BATCH_SIZE = 32
+# Candidates scoring within this much of the best test accuracy count as equally good
+DEFAULT_ACCURACY_TOLERANCE = 0.01
+# ...and single-row latencies up to (1 + this) times the fastest as equally fast.
+# Sub-millisecond latencies swing by tens of percent between runs, so a tighter
+# margin would let measurement noise pick the shipped model.
+DEFAULT_LATENCY_TOLERANCE = 1.0
+
+# Share of new rows held out to check an incremental update (when there are enough)
+UPDATE_HOLDOUT_FRACTION = 0.2
+MIN_UPDATE_HOLDOUT_ROWS = 10
+# An update that loses more holdout accuracy than this is not saved (unless forced)
+DEFAULT_MAX_ACCURACY_DROP = 0.02
+
 # Create directories if they don't exist
 DATA_PATH.mkdir(exist_ok=True)
 MODEL_PATH.mkdir(exist_ok=True)
 
 
-def load_and_preprocess_data():
+def load_and_preprocess_data(chunk_size=DEFAULT_CHUNK_SIZE, use_cache=True):
     """
     Load and preprocess the disease symptom dataset
     
-    Expected CSV format:
+    Expected CSV format (either):
     Disease, Symptom_1, Symptom_2, ..., Symptom_17
+    <one 0/1 column per symptom>, prognosis
+    
+    The file is streamed in chunks of chunk_size rows into a uint8 matrix,
+    which is cached under data/cache/ and memory-mapped by later runs until
+    the CSV changes.
     
     Download from Kaggle and place in data/ folder:
     - Training.csv
@@ -51,32 +88,14 @@ def load_and_preprocess_data():
         return generate_sample_data()
     
     # Load data
-    train_df = pd.read_csv(training_file)
-    test_df = pd.read_csv(testing_file) if testing_file.exists() else None
-    
-    print(f"✅ Loaded training data: {train_df.shape}")
-    if test_df is not None:
-        print(f"✅ Loaded testing data: {test_df.shape}")
+    started = time.perf_counter()
+    X, y, symptom_cols, cache_hit = load_training_data(training_file, chunk_size, use_cache)
+    source = "preprocessed cache" if cache_hit else training_file.name
     
-    # Preprocess
-    # Remove any whitespace from column names
-    train_df.columns = train_df.columns.str.strip()
-    
-    # Get target and features
-    target_col = 'prognosis' if 'prognosis' in train_df.columns else 'Disease'
-    
-    # Get all symptom columns
-    symptom_cols = [col for col in train_df.columns if col != target_col]
-    
-    X = train_df[symptom_cols]
-    y = train_df[target_col]
-    
-    # Handle missing values
-    X = X.fillna(0)
-    
-    # Convert symptoms to binary (0/1)
-    for col in X.columns:
-        X[col] = X[col].apply(lambda x: 1 if x != 0 and pd.notna(x) else 0)
+    print(f"✅ Loaded training data from {source} in {time.perf_counter() - started:.2f}s: "
+          f"{X.shape[0]} rows, {len(symptom_cols)} symptoms ({X.nbytes / 1e6:.1f} MB)")
+    if testing_file.exists():
+        print(f"✅ Found testing data: {testing_file.name}")
     
     return X, y, symptom_cols
 
@@ -131,36 +150,22 @@ def generate_sample_data():
     df.to_csv(DATA_PATH / "Training.csv", index=False)
     print(f"✅ Generated sample training data: {df.shape}")
     
-    X = df.drop('Disease', axis=1)
-    y = df['Disease']
+    X = df[symptoms].to_numpy(dtype=np.uint8)
+    y = df['Disease'].to_numpy()
     
     return X, y, symptoms
 
 
-def train_model(X, y, symptom_cols):
-    """Train and evaluate the disease prediction model"""
-    
-    # Encode labels
-    label_encoder = LabelEncoder()
-    y_encoded = label_encoder.fit_transform(y)
-    
-    # Split data
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y_encoded, test_size=0.2, random_state=42, stratify=y_encoded
-    )
-    
-    print(f"\n📊 Training set size: {len(X_train)}")
-    print(f"📊 Test set size: {len(X_test)}")
-    print(f"📊 Number of diseases: {len(label_encoder.classes_)}")
-    print(f"📊 Number of symptoms: {len(symptom_cols)}")
-    
-    # Train multiple models and compare
-    models = {
+def candidate_models():
+    """Unfitted candidate models, by display name"""
+    return {
         "Random Forest": RandomForestClassifier(
             n_estimators=100,
             max_depth=10,
             random_state=42,
-            n_jobs=-1
+            # Parallelism comes from the training pool (and a single-row
+            # predict is faster without thread fan-out)
+            n_jobs=1
         ),
         "Gradient Boosting": GradientBoostingClassifier(
             n_estimators=100,
@@ -171,42 +176,316 @@ def train_model(X, y, symptom_cols):
             kernel='rbf',
             probability=True,
             random_state=42
+        ),
+        # Cheaper variants, so selection can trade a little accuracy for latency and size
+        "Random Forest (25 trees)": RandomForestClassifier(
+            n_estimators=25,
+            max_depth=8,
+            random_state=42,
+            n_jobs=1
+        ),
+        "Gradient Boosting (30 trees)": GradientBoostingClassifier(
+            n_estimators=30,
+            max_depth=3,
+            random_state=42
+        ),
+        # Supports partial_fit, so `--update` can fold in new cases without refitting
+        "Naive Bayes": BernoulliNB()
+    }
+
+
+def fit_and_score(name, fold, model, X, y, train_idx, test_idx, sample_weight=None,
+                  expand_weights=False, keep_model=False):
+    """
+    Fit one candidate on one split and score it (runs in a training worker)
+    
+    With sample_weight (duplicate counts of deduplicated rows) the fit is
+    weighted and accuracy counts every original row; expand_weights instead
+    fits on the rows repeated, i.e. as if the data had not been deduplicated.
+    """
+    started = time.time()
+    X_train, y_train = X[train_idx], y[train_idx]
+    fit_params = {}
+    if sample_weight is not None:
+        if expand_weights:
+            X_train = np.repeat(X_train, sample_weight[train_idx], axis=0)
+            y_train = np.repeat(y_train, sample_weight[train_idx])
+        else:
+            fit_params['sample_weight'] = sample_weight[train_idx]
+    model.fit(X_train, y_train, **fit_params)
+    fitted = time.time()
+    test_weight = sample_weight[test_idx] if sample_weight is not None else None
+    accuracy = accuracy_score(y[test_idx], model.predict(X[test_idx]), sample_weight=test_weight)
+    return {
+        'name': name,
+        'fold': fold,
+        'accuracy': accuracy,
+        'fit_seconds': fitted - started,
+        'started': started,
+        'finished': time.time(),
+        'model': model if keep_model else None
+    }
+
+
+def measure_inference(model, X, batch_size=SELECTION_BATCH_SIZE, min_time=0.05):
+    """
+    Fastest predict_proba latency in ms for one row and for a batch, scored
+    the way the API does (tree ensembles through the compiled forest engine)
+
+    The minimum over repeated calls is the least disturbed by other load on
+    the machine, so it is far steadier between runs than the median.
+    """
+    engine = compile_model(model)
+    predict_proba = engine.predict_proba if engine is not None else model.predict_proba
+    batch = X[np.arange(batch_size) % len(X)]
+    
+    def best_ms(rows):
+        predict_proba(rows)
+        samples = []
+        deadline = time.perf_counter() + min_time
+        while len(samples) < 5 or time.perf_counter() < deadline:
+            started = time.perf_counter()
+            predict_proba(rows)
+            samples.append((time.perf_counter() - started) * 1000)
+        return float(np.min(samples))
+    
+    return {
+        'engine': "compiled" if engine is not None else "sklearn",
+        'single_row_ms': best_ms(batch[:1]),
+        f'batch_{batch_size}_ms': best_ms(batch)
+    }
+
+
+def serialized_size(model, label_encoder, symptom_cols):
+    """Bytes the model would take as disease_predictor.joblib"""
+    buffer = io.BytesIO()
+    joblib.dump(artifact_data(model, label_encoder, symptom_cols), buffer)
+    return buffer.getbuffer().nbytes
+
+
+def pareto_front(candidates):
+    """Names of candidates no other candidate beats on accuracy, latency and size at once"""
+    def dominates(a, b):
+        no_worse = (
+            a['test_accuracy'] >= b['test_accuracy']
+            and a['single_row_ms'] <= b['single_row_ms']
+            and a['size_bytes'] <= b['size_bytes']
+        )
+        better = (
+            a['test_accuracy'] > b['test_accuracy']
+            or a['single_row_ms'] < b['single_row_ms']
+            or a['size_bytes'] < b['size_bytes']
         )
+        return no_worse and better
+    
+    return {
+        b['name'] for b in candidates
+        if not any(dominates(a, b) for a in candidates if a is not b)
     }
+
+
+def select_model(candidates, max_latency_ms=None, max_size_mb=None,
+                 accuracy_tolerance=DEFAULT_ACCURACY_TOLERANCE,
+                 latency_tolerance=DEFAULT_LATENCY_TOLERANCE):
+    """
+    Pick a candidate under the latency/size budget
+    
+    Among candidates within budget, every one scoring within accuracy_tolerance
+    of the most accurate is considered equally good. Of those, the ones within
+    latency_tolerance of the fastest single-row scorer count as equally fast,
+    and ties go to the most accurate, then the smallest, then by name, so the
+    same data always selects the same model. Returns (name, reason).
+    """
+    eligible = [
+        c for c in candidates
+        if (max_latency_ms is None or c['single_row_ms'] <= max_latency_ms)
+        and (max_size_mb is None or c['size_bytes'] <= max_size_mb * 1e6)
+    ]
+    reason = "within budget"
+    if not eligible:
+        eligible = candidates
+        reason = "no candidate fits the budget, ignoring it"
+    
+    best_accuracy = max(c['test_accuracy'] for c in eligible)
+    good_enough = [c for c in eligible if c['test_accuracy'] >= best_accuracy - accuracy_tolerance]
+    fastest = min(c['single_row_ms'] for c in good_enough)
+    fast_enough = [c for c in good_enough if c['single_row_ms'] <= fastest * (1 + latency_tolerance)]
+    chosen = min(fast_enough, key=lambda c: (-c['test_accuracy'], c['size_bytes'], c['name']))
+    return chosen['name'], reason
+
+
+def train_model(X, y, symptom_cols, n_jobs=-1, dedup=False, max_latency_ms=None, max_size_mb=None,
+                accuracy_tolerance=DEFAULT_ACCURACY_TOLERANCE, search_budget=None,
+                latency_tolerance=DEFAULT_LATENCY_TOLERANCE):
+    """
+    Train and evaluate the disease prediction model
+    
+    Every candidate's CV folds are scheduled together on a process pool of
+    n_jobs workers (-1 uses every CPU), and the feature matrix is memory-mapped
+    into the workers once instead of being pickled per task. The first fold
+    doubles as the holdout split: its score is the reported test accuracy and
+    its fitted model is the one returned, so there is no separate holdout fit.
+    
+    With dedup, identical (symptoms, disease) rows are collapsed and their
+    counts passed as sample_weight. Splits are then drawn over unique rows,
+    so a row never lands in both train and test, and each candidate is
+    also fitted once on the repeated rows to report the speedup and the
+    accuracy delta.
+    
+    Each candidate's inference latency and artifact size are measured and
+    the model is chosen with select_model. Returns the model, the label
+    encoder, the symptom columns and a selection report for the metadata.
+    
+    With search_budget (seconds), a successive-halving hyperparameter search
+    runs on the training split first and its winner joins the candidates as
+    "<family> (tuned)"; the search result is included in the report.
+    """
     
-    best_model = None
-    best_accuracy = 0
-    best_model_name = ""
+    # Encode labels
+    label_encoder = LabelEncoder()
+    y_encoded = label_encoder.fit_transform(y)
+    # 0/1 flags: one byte each is all the workers need to share
+    X = np.ascontiguousarray(X, dtype=np.uint8)
+    
+    weights = None
+    if dedup:
+        n_rows = len(X)
+        X, y_encoded, weights = deduplicate(X, y_encoded)
+        print(f"\n🧬 Deduplicated {n_rows} rows to {len(X)} unique rows ({n_rows / len(X):.1f}x fewer)")
+    
+    # CV folds (stratified when every disease has enough distinct rows); the
+    # first one is also the train/test split used for selection and reporting
+    class_counts = np.bincount(y_encoded)
+    smallest_class = int(class_counts[class_counts > 0].min())
+    if smallest_class >= 2:
+        # Every fold needs a row of each disease
+        n_splits = min(CV_FOLDS, smallest_class)
+        if n_splits < CV_FOLDS:
+            print(f"⚠️ A disease has only {smallest_class} distinct rows; using {n_splits} CV folds")
+        splitter = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=42)
+    else:
+        print("⚠️ A disease has a single distinct row; CV folds are not stratified")
+        splitter = KFold(n_splits=CV_FOLDS, shuffle=True, random_state=42)
+    folds = list(splitter.split(X, y_encoded))
+    train_idx, test_idx = folds[0]
+    y_test = y_encoded[test_idx]
+    test_weight = weights[test_idx] if weights is not None else None
+    
+    print(f"\n📊 Training set size: {len(train_idx)}")
+    print(f"📊 Test set size: {len(test_idx)}")
+    print(f"📊 Number of diseases: {len(label_encoder.classes_)}")
+    print(f"📊 Number of symptoms: {len(symptom_cols)}")
     
-    print("\n🔬 Training and evaluating models...")
-    print("-" * 50)
+    # Train multiple models and compare
+    models = candidate_models()
+    search = None
+    if search_budget:
+        # Only the training split is searched, so the holdout stays unseen
+        search = successive_halving(
+            X[train_idx], y_encoded[train_idx],
+            weights[train_idx] if weights is not None else None,
+            budget_seconds=search_budget,
+            n_jobs=n_jobs
+        )
+        if search['best'] is not None:
+            models[f"{search['best']['family']} (tuned)"] = tuned_model(search['best'])
     
+    tasks = []
     for name, model in models.items():
-        # Train
-        model.fit(X_train, y_train)
-        
-        # Evaluate
-        y_pred = model.predict(X_test)
-        accuracy = accuracy_score(y_test, y_pred)
-        
-        # Cross-validation
-        cv_scores = cross_val_score(model, X, y_encoded, cv=5)
+        for fold, (fold_train, fold_test) in enumerate(folds):
+            tasks.append(delayed(fit_and_score)(
+                name, fold, clone(model), X, y_encoded, fold_train, fold_test, weights,
+                keep_model=fold == 0
+            ))
+        if dedup:
+            # Same split, every duplicate row fitted: the cost dedup avoids
+            tasks.append(delayed(fit_and_score)(
+                name, "full data", clone(model), X, y_encoded, train_idx, test_idx, weights,
+                expand_weights=True
+            ))
+    
+    print(f"\n🔬 Training and evaluating models ({len(tasks)} fits on {effective_n_jobs(n_jobs)} workers)...")
+    print("-" * 50)
+    
+    started = time.time()
+    # max_nbytes=0 memory-maps every input array once for the whole pool
+    results = Parallel(n_jobs=n_jobs, max_nbytes=0)(tasks)
+    print(f"⏱️ All fits finished in {time.time() - started:.1f}s")
+    
+    candidates = []
+    fitted_models = {}
+    
+    for name in models:
+        runs = [run for run in results if run['name'] == name]
+        holdout = next(run for run in runs if run['fold'] == 0)
+        full_data = next((run for run in runs if run['fold'] == "full data"), None)
+        cv_scores = np.array([run['accuracy'] for run in runs if isinstance(run['fold'], int)])
+        accuracy = holdout['accuracy']
+        wall_time = max(run['finished'] for run in runs) - min(run['started'] for run in runs)
+        fit_time = sum(run['finished'] - run['started'] for run in runs)
         
         print(f"\n{name}:")
-        print(f"  Test Accuracy: {accuracy:.4f}")
+        print(f"  Test Accuracy: {accuracy:.4f} (fold 0 holdout)")
         print(f"  CV Accuracy: {cv_scores.mean():.4f} (+/- {cv_scores.std() * 2:.4f})")
+        print(f"  Wall Time: {wall_time:.1f}s ({fit_time:.1f}s of fitting across {len(runs)} fits)")
+        if full_data is not None:
+            speedup = full_data['fit_seconds'] / max(holdout['fit_seconds'], 1e-9)
+            print(f"  Dedup: fit {holdout['fit_seconds']:.2f}s vs {full_data['fit_seconds']:.2f}s on all rows "
+                  f"({speedup:.1f}x), accuracy delta {accuracy - full_data['accuracy']:+.4f}")
         
-        if accuracy > best_accuracy:
-            best_accuracy = accuracy
-            best_model = model
-            best_model_name = name
+        # Serving cost, measured on the held-out rows
+        model = holdout['model']
+        fitted_models[name] = model
+        candidate = {
+            'name': name,
+            'test_accuracy': accuracy,
+            'cv_accuracy': float(cv_scores.mean()),
+            **measure_inference(model, X[test_idx]),
+            'size_bytes': serialized_size(model, label_encoder, symptom_cols)
+        }
+        candidates.append(candidate)
+        print(f"  Inference: {candidate['single_row_ms']:.3f} ms/row, "
+              f"{candidate[f'batch_{SELECTION_BATCH_SIZE}_ms']:.3f} ms per {SELECTION_BATCH_SIZE} rows "
+              f"({candidate['engine']}); size {candidate['size_bytes'] / 1e6:.2f} MB")
+    
+    front = pareto_front(candidates)
+    best_model_name, reason = select_model(
+        candidates, max_latency_ms, max_size_mb, accuracy_tolerance, latency_tolerance
+    )
+    for candidate in candidates:
+        candidate['pareto_optimal'] = candidate['name'] in front
+    
+    print("\n📐 Accuracy / latency / size trade-off (* = Pareto-optimal):")
+    for c in sorted(candidates, key=lambda c: c['single_row_ms']):
+        marker = "*" if c['pareto_optimal'] else " "
+        print(f"  {marker} {c['name']:<30} acc {c['test_accuracy']:.4f}  "
+              f"{c['single_row_ms']:.3f} ms/row  {c['size_bytes'] / 1e6:.2f} MB")
+    
+    best_model = fitted_models[best_model_name]
+    best_accuracy = next(c['test_accuracy'] for c in candidates if c['name'] == best_model_name)
+    report = {
+        'selected': best_model_name,
+        'policy': {
+            'max_latency_ms': max_latency_ms,
+            'max_size_mb': max_size_mb,
+            'accuracy_tolerance': accuracy_tolerance,
+            'latency_tolerance': latency_tolerance,
+            'result': reason
+        },
+        'candidates': candidates
+    }
+    if search is not None:
+        report['search'] = search
     
-    print(f"\n🏆 Best Model: {best_model_name} (Accuracy: {best_accuracy:.4f})")
+    print(f"\n🏆 Best Model: {best_model_name} (Accuracy: {best_accuracy:.4f}, {reason})")
     
     # Detailed evaluation of best model
-    y_pred = best_model.predict(X_test)
+    y_pred = best_model.predict(X[test_idx])
     print("\n📋 Classification Report:")
-    print(classification_report(y_test, y_pred, target_names=label_encoder.classes_))
+    print(classification_report(
+        y_test, y_pred, labels=np.arange(len(label_encoder.classes_)),
+        target_names=label_encoder.classes_, sample_weight=test_weight, zero_division=0
+    ))
     
     # Feature importance (for tree-based models)
     if hasattr(best_model, 'feature_importances_'):
@@ -218,11 +497,11 @@ def train_model(X, y, symptom_cols):
         print("\n🔍 Top 10 Most Important Symptoms:")
         print(importance.head(10).to_string(index=False))
     
-    return best_model, label_encoder, symptom_cols
+    return best_model, label_encoder, symptom_cols, report
 
 
-def save_model(model, label_encoder, symptom_cols):
-    """Save the trained model and encoders"""
+def artifact_data(model, label_encoder, symptom_cols):
+    """Contents of disease_predictor.joblib"""
     
     model_data = {
         'model': model,
@@ -231,44 +510,230 @@ def save_model(model, label_encoder, symptom_cols):
         'symptom_encoder': None  # Can add symptom encoder if needed
     }
     
+    # Tree ensembles also ship as flat arrays for the API's compiled forest engine
+    engine = compile_model(model)
+    if engine is not None:
+        model_data['compiled_forest'] = engine.to_arrays()
+    return model_data
+
+
+def save_model(model, label_encoder, symptom_cols, selection=None, update=None):
+    """
+    Save the trained model and encoders
+    
+    With update (an incremental update record) the existing metadata is kept,
+    so the original training selection survives, and the record is appended
+    to its "updates" list.
+    """
+    
+    model_data = artifact_data(model, label_encoder, symptom_cols)
     model_file = MODEL_PATH / "disease_predictor.joblib"
-    joblib.dump(model_data, model_file)
+    # Write to a temp file and rename so a running API never reads a partial artifact
+    tmp_file = model_file.with_suffix(".joblib.tmp")
+    joblib.dump(model_data, tmp_file)
+    os.replace(tmp_file, model_file)
     
     print(f"\n💾 Model saved to: {model_file}")
     
     # Also save a metadata file
-    metadata = {
+    metadata_file = MODEL_PATH / "model_metadata.json"
+    metadata = {}
+    if update is not None and metadata_file.exists():
+        with open(metadata_file) as f:
+            metadata = json.load(f)
+    metadata.update({
         'model_type': type(model).__name__,
         'num_diseases': len(label_encoder.classes_),
         'diseases': list(label_encoder.classes_),
         'num_symptoms': len(symptom_cols),
-        'symptoms': symptom_cols
-    }
+        'symptoms': symptom_cols,
+        'size_bytes': model_file.stat().st_size
+    })
+    if update is not None:
+        metadata.setdefault('updates', []).append(update)
+    if selection is not None:
+        selection = dict(selection)
+        search = selection.pop('search', None)
+        # Latency and size of every candidate, for capacity planning
+        metadata['selection'] = selection
+        metadata['inference'] = next(c for c in selection['candidates'] if c['name'] == selection['selected'])
+        if search is not None:
+            search_file = MODEL_PATH / "hyperparameter_search.json"
+            with open(search_file, 'w') as f:
+                json.dump(search, f, indent=2)
+            metadata['search'] = {'best': search['best'], 'trace_file': search_file.name}
+            print(f"🔎 Search trace saved to: {search_file}")
     
-    import json
-    metadata_file = MODEL_PATH / "model_metadata.json"
     with open(metadata_file, 'w') as f:
         json.dump(metadata, f, indent=2)
     
     print(f"📄 Metadata saved to: {metadata_file}")
 
 
+def update_model(csv_path, n_trees=DEFAULT_UPDATE_TREES, max_accuracy_drop=DEFAULT_MAX_ACCURACY_DROP,
+                 force=False):
+    """
+    Fold newly labeled rows into the saved model instead of retraining
+    
+    The rows (either CSV layout) are aligned to the model's symptom columns
+    and new diseases are appended to the label encoder. A holdout of the new
+    rows is scored before and after the update; the updated model is only
+    saved if it doesn't lose more than max_accuracy_drop there (or force).
+    Returns True if the artifact was updated.
+    """
+    
+    started = time.perf_counter()
+    model_file = MODEL_PATH / "disease_predictor.joblib"
+    if not model_file.exists():
+        print(f"❌ No trained model at {model_file}; run train_model.py first")
+        return False
+    saved_data = joblib.load(model_file)
+    model = saved_data['model']
+    label_encoder = saved_data['disease_encoder']
+    symptom_cols = list(saved_data['symptom_list'])
+    
+    X_raw, labels, columns = read_training_csv(Path(csv_path))
+    X, unknown = align_features(X_raw, columns, symptom_cols)
+    if unknown:
+        print(f"⚠️ Ignoring {len(unknown)} symptoms the model has no column for: {', '.join(unknown[:10])}")
+    y, added = grow_label_encoder(label_encoder, list(labels))
+    print(f"\n📥 {len(X)} new rows from {Path(csv_path).name}, "
+          f"{len(set(y.tolist()))} diseases ({len(added)} new: {', '.join(added) or 'none'})")
+    if not len(X):
+        print("⚠️ Nothing to update")
+        return False
+    
+    # Quick check on rows the update doesn't see
+    n_holdout = int(len(X) * UPDATE_HOLDOUT_FRACTION)
+    if n_holdout < MIN_UPDATE_HOLDOUT_ROWS:
+        n_holdout = 0
+        print(f"⚠️ Too few rows for a holdout check (need {MIN_UPDATE_HOLDOUT_ROWS / UPDATE_HOLDOUT_FRACTION:.0f})")
+    order = np.random.RandomState(42).permutation(len(X))
+    holdout_idx, fit_idx = order[:n_holdout], order[n_holdout:]
+    accuracy_before = accuracy_score(y[holdout_idx], model.predict(X[holdout_idx])) if n_holdout else None
+    
+    try:
+        model, method = apply_update(model, X[fit_idx], y[fit_idx], len(label_encoder.classes_), n_trees)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return False
+    accuracy_after = accuracy_score(y[holdout_idx], model.predict(X[holdout_idx])) if n_holdout else None
+    elapsed = time.perf_counter() - started
+    
+    print(f"🔄 Updated {type(model).__name__} ({method}) in {elapsed:.1f}s")
+    if n_holdout:
+        print(f"   Holdout ({n_holdout} rows): accuracy {accuracy_before:.4f} -> {accuracy_after:.4f}")
+        if accuracy_after < accuracy_before - max_accuracy_drop and not force:
+            print(f"❌ Update loses more than {max_accuracy_drop} holdout accuracy; not saved (use --force)")
+            return False
+    
+    update = {
+        'source': Path(csv_path).name,
+        'updated_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'method': method,
+        'rows': int(len(fit_idx)),
+        'new_diseases': added,
+        'ignored_symptoms': unknown,
+        'holdout': {
+            'rows': n_holdout,
+            'accuracy_before': accuracy_before,
+            'accuracy_after': accuracy_after
+        },
+        'seconds': elapsed,
+        'inference': measure_inference(model, X)
+    }
+    save_model(model, label_encoder, symptom_cols, update=update)
+    return True
+
+
 def main():
     """Main training pipeline"""
     
+    parser = argparse.ArgumentParser(description="Train the disease prediction model")
+    parser.add_argument(
+        "--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+        help="CSV rows parsed at a time while loading the training data"
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true",
+        help="Parse the CSV even if data/cache/ holds an up-to-date preprocessed copy"
+    )
+    parser.add_argument(
+        "--dedup", action="store_true",
+        help="Collapse duplicate rows into sample weights (reports speedup and accuracy delta)"
+    )
+    parser.add_argument(
+        "--max-latency-ms", type=float,
+        help="Only select models scoring one row within this many milliseconds"
+    )
+    parser.add_argument(
+        "--max-size-mb", type=float,
+        help="Only select models whose artifact is at most this large"
+    )
+    parser.add_argument(
+        "--accuracy-tolerance", type=float, default=DEFAULT_ACCURACY_TOLERANCE,
+        help="Prefer the cheapest model within this much of the best test accuracy"
+    )
+    parser.add_argument(
+        "--latency-tolerance", type=float, default=DEFAULT_LATENCY_TOLERANCE,
+        help="Treat models scoring a row within (1 + this) times the fastest as equally fast"
+    )
+    parser.add_argument(
+        "--search", nargs="?", type=float, const=DEFAULT_BUDGET_SECONDS, metavar="SECONDS",
+        help="Run a successive-halving hyperparameter search within this wall-clock budget "
+             f"(default {DEFAULT_BUDGET_SECONDS}s) and add the winner to the candidates"
+    )
+    parser.add_argument(
+        "--update", metavar="CSV",
+        help="Fold the labeled rows in CSV into the saved model instead of retraining"
+    )
+    parser.add_argument(
+        "--update-trees", type=int, default=DEFAULT_UPDATE_TREES,
+        help="Trees a forest model grows on the new rows during --update"
+    )
+    parser.add_argument(
+        "--max-accuracy-drop", type=float, default=DEFAULT_MAX_ACCURACY_DROP,
+        help="Largest holdout accuracy loss an --update may cause and still be saved"
+    )
+    parser.add_argument(
+        "--force", action="store_true",
+        help="Save an --update even if it fails the holdout check"
+    )
+    parser.add_argument(
+        "--jobs", type=int, default=int(os.getenv("ML_TRAIN_JOBS", "-1")),
+        help="Worker processes for fitting candidates and CV folds (-1 = all CPUs)"
+    )
+    args = parser.parse_args()
+    
     print("=" * 60)
     print("🏥 Disease Prediction Model Training")
     print("=" * 60)
     
+    if args.update:
+        # Incremental mode: no data loading, no candidate comparison
+        if not update_model(args.update, args.update_trees, args.max_accuracy_drop, args.force):
+            raise SystemExit(1)
+        print("\n✅ Update complete!")
+        return
+    
     # Load data
     print("\n📁 Loading data...")
-    X, y, symptom_cols = load_and_preprocess_data()
+    X, y, symptom_cols = load_and_preprocess_data(args.chunk_size, use_cache=not args.no_cache)
     
     # Train model
-    model, label_encoder, symptom_cols = train_model(X, y, symptom_cols)
+    model, label_encoder, symptom_cols, selection = train_model(
+        X, y, symptom_cols,
+        n_jobs=args.jobs,
+        dedup=args.dedup,
+        max_latency_ms=args.max_latency_ms,
+        max_size_mb=args.max_size_mb,
+        accuracy_tolerance=args.accuracy_tolerance,
+        search_budget=args.search,
+        latency_tolerance=args.latency_tolerance
+    )
     
     # Save model
-    save_model(model, label_encoder, symptom_cols)
+    save_model(model, label_encoder, symptom_cols, selection)
     
     print("\n" + "=" * 60)
     print("✅ Training complete!")